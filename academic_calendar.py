@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+학년도 달력 - 학년도의 모든 날짜를 datetime64[D] 배열로 두고
+평일/방학/제외/업무 날짜를 불리언 마스크로 계산
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from date_extraction import to_day_array
+
+# 요일 이름 (월요일=0, strftime('%A')와 같은 표기)
+WEEKDAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+
+
+def academic_year_days(today=None):
+    """
+    기준일이 속한 학년도(3월 1일 ~ 다음 해 2월 28일)의 모든 날짜
+
+    Returns:
+        datetime64[D] 배열
+    """
+    today = today or datetime.now()
+    first_year = today.year if today.month >= 3 else today.year - 1
+    start = np.datetime64(f'{first_year}-03-01', 'D')
+    end = np.datetime64(f'{first_year + 1}-02-28', 'D')
+    return np.arange(start, end + 1, dtype='datetime64[D]')
+
+
+def weekday_index(days):
+    """날짜 배열의 요일 번호 (월요일=0 ~ 일요일=6)"""
+    # 1970-01-01은 목요일(3)
+    return (days.astype('int64') + 3) % 7
+
+
+def date_mask(days, dates):
+    """days 중 dates에 포함된 날짜 마스크"""
+    dates = to_day_array(list(dates))
+    return np.isin(days, dates[~np.isnat(dates)])
+
+
+def period_mask(days, period):
+    """days 중 (시작, 종료) 기간에 포함된 날짜 마스크 (기간이 비어 있으면 모두 False)"""
+    start, end = period if period else (None, None)
+    if not (start and end):
+        return np.zeros(len(days), dtype=bool)
+    start, end = to_day_array([start, end])
+    return (days >= start) & (days <= end)
+
+
+def availability_masks(days, holidays, busy_dates, excluded_dates, vacations):
+    """
+    학년도 날짜별 마스크 계산
+
+    Args:
+        days: academic_year_days() 결과
+        holidays: 공휴일 날짜 목록
+        busy_dates: 업로드된 데이터에 있는 (업무가 있는) 날짜 목록
+        excluded_dates: 사용자가 제외한 날짜 목록
+        vacations: {'summer': (시작, 종료), 'winter': (시작, 종료)}
+
+    Returns:
+        dict - 'business'(공휴일이 아닌 평일), 'vacation', 'excluded', 'busy', 'available' 마스크
+    """
+    holiday_days = to_day_array(list(holidays))
+    business = np.is_busday(days, holidays=holiday_days[~np.isnat(holiday_days)])
+    vacation = period_mask(days, vacations.get('summer')) | period_mask(days, vacations.get('winter'))
+    excluded = date_mask(days, excluded_dates)
+    busy = date_mask(days, busy_dates)
+    return {
+        'business': business,
+        'vacation': vacation,
+        'excluded': excluded,
+        'busy': busy,
+        'available': business & ~vacation & ~excluded & ~busy,
+    }
+
+
+def available_days_frame(days, mask):
+    """마스크에 해당하는 날짜와 요일 데이터프레임 ('날짜', '요일')"""
+    selected = days[mask]
+    return pd.DataFrame({
+        '날짜': selected.astype('datetime64[ns]'),
+        '요일': WEEKDAY_NAMES[weekday_index(selected)],
+    })
+
+
+def monthly_counts(days, mask):
+    """월별('YYYY-MM') 마스크 날짜 수 (해당 날짜가 없는 달도 0으로 포함)"""
+    months = days.astype('datetime64[M]')
+    month_labels, month_index = np.unique(months, return_inverse=True)
+    counts = np.bincount(month_index, weights=mask, minlength=len(month_labels)).astype('int64')
+    return pd.Series(counts, index=month_labels.astype(str))
+
+
+def weekday_counts(days, mask):
+    """요일별 마스크 날짜 수 (월요일부터 금요일 순서)"""
+    counts = np.bincount(weekday_index(days[mask]), minlength=7)[:5]
+    return pd.Series(counts, index=WEEKDAY_NAMES[:5])
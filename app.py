@@ -1,22 +1,44 @@
 import streamlit as st
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import random
 
 # 페이지 설정 (가장 먼저 호출되어야 함)
 st.set_page_config(page_title="학교 생활 도우미", page_icon="🏫", layout="centered")
 
 import pandas as pd
+import numpy as np
 import requests
 import json
-import io
-from datetime import datetime, timedelta
-from workalendar.asia import SouthKorea
-import re  # 정규 표현식 사용을 위해 추가
+from datetime import datetime
 import base64
 import time
 import os
 import uuid
 import tempfile
 import logging
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from date_extraction import (
+    extract_dates, extract_date_cache_info, expand_intervals, to_day_array, log_extraction_summary,
+    build_trace_table
+)
+from progress import ThrottledProgress
+from column_profiler import profile_date_columns, default_date_columns
+from holiday_table import get_holidays, precompute_holidays
+from availability import AvailabilityBitmap
+from spreadsheet_reader import read_spreadsheet, reader_signature
+from parsed_cache import read_with_cache
+from blob_cache import adopt_file, pinned_blob_file
+from storage_batch import delete_blobs, load_wipe_checkpoint, wipe_bucket
+from rtdb_cache import begin_rerun, cached_delete, cached_get, cached_set, cached_transaction, cached_update
+from presence import active_count, forget_sessions, heartbeat, sweep_ended_sessions
+from result_export import available_export_formats, deferred_export
+from time_slots import DEFAULT_WINDOW, TimeIntervalIndex, interval_timestamps, slot_table
+from academic_calendar import (
+    academic_year_days, availability_masks, available_days_frame, monthly_counts, weekday_counts
+)
 
 # 로깅 설정
 logging.basicConfig(
@@ -29,6 +51,12 @@ logging.basicConfig(
 logger = logging.getLogger('전학공앱')
 logger.setLevel(logging.INFO)
 
+# 공휴일 표 준비 (프로세스에서 처음 한 번만 계산하고 이후에는 메모리의 표를 사용)
+precompute_holidays()
+
+# 방의 공유 파일을 동시에 내려받아 읽을 스레드 수
+STORAGE_DOWNLOAD_WORKERS = int(os.environ.get('STORAGE_DOWNLOAD_WORKERS', 8))
+
 # Firebase 관련 라이브러리 조건부 임포트
 firebase_available = False
 firebase = None
@@ -37,6 +65,7 @@ db = None
 try:
     import firebase_admin
     from firebase_admin import credentials, db as firebase_rtdb, storage
+    from google.cloud import storage as gcs  # firebase-admin과 함께 설치됨 (스레드별 클라이언트 생성용)
 
     # Streamlit secrets에서 직접 dictionary 형태로 자격 증명을 로드
     if "firebase" in st.secrets:
@@ -131,25 +160,39 @@ if 'user_id' in current_query_params and st.session_state.session_id != current_
     st.session_state.session_id = current_query_params['user_id']
 
 
-# 사용자 상태 업데이트 함수
+# 접속 상태를 기록할 그룹 (방에 참여 중이면 방 참여자, 아니면 작업 세션 사용자)
+def presence_group():
+    if st.session_state.room_id and st.session_state.school_code:
+        return f"rooms/{st.session_state.school_code}/{st.session_state.room_id}", "participants"
+    return f"sessions/{st.session_state.work_session_id}", "users"
+
+# 현재 Streamlit 세션 ID (런타임 밖에서 실행되면 None)
+def streamlit_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+# Streamlit 세션이 아직 연결되어 있는지
+def is_streamlit_session_active(session_id):
+    if not runtime.exists():
+        return True
+    return runtime.get_instance().is_active_session(session_id)
+
+# 사용자 상태 업데이트 함수 (마지막으로 기록한 지 일정 시간이 지났을 때만 씀)
 def update_user_status(status="online"):
     global firebase_available  # global 선언을 함수 시작 부분에 배치
     
     if firebase_available:
         try:
-            # 방에 참여 중이면 방 참여자 상태 업데이트, 아니면 전역 세션 상태
-            if st.session_state.room_id and st.session_state.school_code:
-                user_path = f"rooms/{st.session_state.school_code}/{st.session_state.room_id}/participants/{st.session_state.session_id}"
-                db.reference(user_path).update({
-                    "last_seen": int(time.time()),
-                    "status": status
-                })
-            else:
-                user_path = f"sessions/{st.session_state.work_session_id}/users/{st.session_state.session_id}"
-                db.reference(user_path).update({
-                    "last_seen": int(time.time()),
-                    "status": status
-                })
+            group_path, members_key = presence_group()
+            heartbeat(
+                db, st.session_state.setdefault("presence", {}),
+                group_path, members_key, st.session_state.session_id,
+                status=status, session_id=streamlit_session_id(),
+                # 작업 세션은 첫 기록이 그룹을 만들지만, 방은 삭제된 뒤 다시 만들지 않음
+                create_group=members_key == "users"
+            )
+            # 연결이 끊긴 다른 세션의 사용자를 오프라인으로 기록
+            sweep_ended_sessions(db, is_streamlit_session_active)
         except Exception as e:
             st.sidebar.error(f"사용자 상태 업데이트 실패: {e}")
             st.sidebar.warning("Firebase 데이터베이스 보안 규칙을 확인하세요.")
@@ -166,35 +209,35 @@ def on_user_exit():
             # 종료 시에는 오류 메시지를 표시하지 않음
             firebase_available = False
 
-# 활성 사용자 가져오기
+# 활성 사용자 가져오기 (상태를 기록할 때 함께 계산해 둔 인원 수를 읽음)
 def get_active_users():
     if firebase_available:
         try:
-            # 방에 참여 중이면 방 참여자 수
-            if st.session_state.room_id and st.session_state.school_code:
-                users_path = f"rooms/{st.session_state.school_code}/{st.session_state.room_id}/participants"
-            else:
-                users_path = f"sessions/{st.session_state.work_session_id}/users"
-                
-            users = db.reference(users_path).get()
-            active_users = []
-
-            if users:
-                for user_id, user_data in users.items():
-                    # 마지막 활동이 3분 이내인 사용자만 활성 상태로 간주
-                    if user_data.get("last_seen", 0) > (time.time() - 180):
-                        active_users.append(user_id)
-
-            return len(active_users)
+            group_path, members_key = presence_group()
+            return active_count(db, group_path, members_key)
         except Exception as e:
             # 오류 발생 시 조용히 기본값 반환
             return 1
     return 1  # Firebase 사용 불가 시 기본값 1 반환
 
+# 내용 해시 기준 Storage 경로 (방과 관계없이 학교 단위로 공유)
+def content_blob_path(school_code, content_sha256, ext):
+    return f"uploads/{school_code}/content/{content_sha256}{ext.lower()}"
+
 # 업로드된 파일 저장 함수 (Storage 사용)
-def save_uploaded_file(uploaded_file, school_code, school_name):
+def save_uploaded_file(uploaded_file, school_code, school_name, df=None, skip_hashes=()):
     """
     업로드된 파일 저장 및 Firebase Storage/Database에 업로드
+
+    Storage에는 내용의 SHA-256 해시로 저장하므로 같은 학교에서 같은 내용의 파일을
+    다시 올리면 새로 업로드하지 않고 기존 파일을 가리키는 메타데이터만 추가함
+
+    Args:
+        df: 이미 읽어 둔 데이터프레임 (있으면 메타데이터용으로 파일을 다시 읽지 않음)
+        skip_hashes: 이미 올린 파일의 내용 해시 - 같은 내용이면 로컬 파일만 지우고 저장하지 않음
+
+    Returns:
+        저장 결과 dict (content_sha256은 저장하면서 계산한 내용 해시 - 호출한 쪽에서 다시 계산하지 않음)
     """
     logging.info(f"파일 처리 시작: {uploaded_file.name}")
     
@@ -205,57 +248,82 @@ def save_uploaded_file(uploaded_file, school_code, school_name):
     name_parts = os.path.splitext(original_name)
     unique_filename = f"{name_parts[0]}_{timestamp}_{short_uuid}{name_parts[1]}"
     
-    # 로컬 저장 디렉토리 생성
+    # 로컬 저장 디렉토리 생성 (업로드가 끝나면 Storage 파일 캐시로 옮김)
     save_folder = os.path.join("uploads", school_code)
     os.makedirs(save_folder, exist_ok=True)
     
     # 저장 경로 (고유 파일명 사용)
     save_path = os.path.join(save_folder, unique_filename)
     
-    # 로컬 파일 저장
+    # 로컬 파일 저장 (쓰면서 내용 해시와 Storage 비교용 MD5 계산)
+    content_hash = hashlib.sha256()
+    content_md5 = hashlib.md5()
+    buffer = uploaded_file.getbuffer()
     with open(save_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+        for offset in range(0, len(buffer), 1024 * 1024):
+            chunk = buffer[offset:offset + 1024 * 1024]
+            content_hash.update(chunk)
+            content_md5.update(chunk)
+            f.write(chunk)
+    content_sha256 = content_hash.hexdigest()
+    
+    if content_sha256 in skip_hashes:
+        os.remove(save_path)
+        logging.info(f"같은 내용의 파일이 이미 있어 저장하지 않음: {original_name}")
+        return {
+            "local_path": None,
+            "unique_filename": unique_filename,
+            "original_filename": original_name,
+            "content_sha256": content_sha256,
+            "firebase_upload": False
+        }
     
     logging.info(f"로컬 파일 저장 완료: {save_path}")
     
     # Firebase 업로드 시도
     firebase_upload_success = False
+    blob_path = content_blob_path(school_code, content_sha256, name_parts[1])
+    blob_generation = None
+    ref_acquired = False
     if firebase_available and db is not None:
         try:
-            # 1. 파일 데이터 분석 (메타데이터용)
-            file_ext = os.path.splitext(uploaded_file.name)[1].lower()
-            if file_ext in ['.xlsx', '.xls']:
-                df = pd.read_excel(save_path)
-            elif file_ext == '.csv':
-                df = pd.read_csv(save_path)
-            else:
-                # 분석하지 않고 계속 진행
-                df = pd.DataFrame()
+            # 1. 파일 데이터 분석 (메타데이터용 - 업로드 시 읽은 데이터프레임이 없을 때만 읽음)
+            if df is None:
+                # 지원하지 않는 형식이면 빈 데이터프레임 (분석하지 않고 계속 진행)
+                df = read_spreadsheet(save_path)
             
-            # 날짜 형식으로 추정되는 컬럼 추출
+            # 날짜 컬럼 추정 (변환 단계와 같은 탐지 기준 사용)
             date_columns = []
             if not df.empty:
-                for col in df.columns:
-                    if '날짜' in str(col) or 'date' in str(col).lower() or '일자' in str(col):
-                        date_columns.append(col)
+                date_columns = [str(col) for col in default_date_columns(profile_date_columns(df))]
             
             # 2. Firebase Storage에 파일 업로드 (고유 파일명 사용)
             bucket = storage.bucket()
-            room_id_path = st.session_state.get("room_id", "common")
-            blob_path = f"uploads/{school_code}/{room_id_path}/{unique_filename}"  # 고유 파일명 사용
-            blob = bucket.blob(blob_path)
-            
-            # 메타데이터 설정 (원본 파일명 포함)
-            blob.metadata = {
-                "upload_user": st.session_state.session_id,
-                "school_name": school_name,
-                "original_filename": original_name,  # 원본 파일명 저장
-                "unique_filename": unique_filename,   # 고유 파일명 저장
-                "room_id": st.session_state.get("room_id")
-            }
+            # 참조 수를 먼저 늘려 방 초기화가 이 파일을 지우지 못하게 한 뒤 업로드 여부를 정함
+            # (늘리기 전 참조가 없었으면 초기화가 지우는 중일 수 있으므로 파일이 있어도 다시 올림)
+            previous_refs = acquire_content_ref(school_code, content_sha256)
+            ref_acquired = True
+            existing_blob = bucket.get_blob(blob_path) if previous_refs > 0 else None
             
-            blob.upload_from_filename(save_path)
-            logging.info(f"Firebase Storage 업로드 성공: {blob_path}")
+            if existing_blob is not None:
+                # 같은 내용의 파일이 이미 있으면 업로드하지 않고 참조만 추가
+                logging.info(f"같은 내용의 파일이 이미 저장되어 있어 업로드를 건너뜀: {blob_path}")
+                blob_generation = existing_blob.generation
+            else:
+                blob = bucket.blob(blob_path)
+                
+                # 메타데이터 설정 (원본 파일명 포함)
+                blob.metadata = {
+                    "upload_user": st.session_state.session_id,
+                    "school_name": school_name,
+                    "original_filename": original_name,  # 원본 파일명 저장
+                    "unique_filename": unique_filename,   # 고유 파일명 저장
+                    "room_id": st.session_state.get("room_id")
+                }
+                
+                blob.upload_from_filename(save_path)
+                blob_generation = blob.generation
+                logging.info(f"Firebase Storage 업로드 성공: {blob_path}")
             
             # 3. Realtime Database에 메타데이터 저장
             file_metadata = {
@@ -264,7 +332,9 @@ def save_uploaded_file(uploaded_file, school_code, school_name):
                 "upload_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "upload_user": st.session_state.session_id,
                 "storage_path": blob_path,  # 스토리지 경로 저장
-                "column_names": list(df.columns) if not df.empty else [],
+                "content_sha256": content_sha256,  # 내용 해시 (같은 파일 중복 처리 방지)
+                # 원본 파일의 전체 헤더 (읽을 때 고른 컬럼만이 아니라)
+                "column_names": df.attrs.get("source_columns", list(df.columns)) if not df.empty else [],
                 "row_count": len(df) if not df.empty else 0,
                 "date_columns": date_columns,
                 "school_name": school_name,
@@ -274,7 +344,12 @@ def save_uploaded_file(uploaded_file, school_code, school_name):
             
             # 파일 키 생성 (고유 파일명 기반, 특수문자 제외)
             file_key = unique_filename.replace('.', '_')
-            db.reference(f"file_uploads/{school_code}/{file_key}").set(file_metadata)
+            room_id = st.session_state.get("room_id")
+            # 메타데이터와 방별 파일 수를 한 번의 다중 경로 업데이트로 기록 (참조 수는 위에서 늘림)
+            cached_update(db, "", {
+                file_uploads_path(school_code, room_id, file_key): file_metadata,
+                file_count_path(school_code, room_id): server_increment(1),
+            })
             
             logging.info(f"Firebase RB에 메타데이터 저장 성공: {file_key}")
             firebase_upload_success = True
@@ -282,17 +357,110 @@ def save_uploaded_file(uploaded_file, school_code, school_name):
         except Exception as e:
             logging.error(f"Firebase 업로드 실패: {e}")
             st.warning(f"파일은 로컬에 저장되었지만 클라우드 백업 중 오류 발생: {e}")
+            if ref_acquired:
+                # 메타데이터를 쓰지 못했으면 늘린 참조 수를 되돌림 (실패해도 파일이 남을 뿐)
+                try:
+                    cached_update(db, "", {content_ref_path(school_code, content_sha256): server_increment(-1)})
+                except Exception as rollback_error:
+                    logging.warning(f"파일 참조 수 되돌리기 실패: {rollback_error}")
             if "storage" not in str(e).lower():
                 # 스토리지 오류가 아니면 재발생시키지 않음
                 pass
     
+    # 로컬 파일은 Storage 파일 캐시로 옮겨 같은 방에서 다시 불러올 때 내려받지 않음
+    # (업로드에 실패해 generation을 모르면 다음 조회 때 Storage의 파일로 다시 받음)
+    save_path = adopt_file(
+        blob_path, save_path,
+        md5=base64.b64encode(content_md5.digest()).decode('ascii'),
+        generation=blob_generation
+    )
+    
     return {
         "local_path": save_path,
         "unique_filename": unique_filename,  # 고유 파일명 반환
         "original_filename": original_name,   # 원본 파일명 반환
+        "content_sha256": content_sha256,
         "firebase_upload": firebase_upload_success
     }
 
+# Storage 파일을 받아 데이터프레임으로 읽기 (st.* 를 호출하지 않으므로 작업 스레드에서 사용 가능)
+def fetch_storage_file(storage_path):
+    """
+    로컬 캐시의 파일이 blob과 같으면(md5/generation) 내려받지 않고 캐시 파일을 읽음
+
+    Returns:
+        데이터프레임 (지원하지 않는 형식이면 None)
+    Raises:
+        FileNotFoundError: Storage에 파일이 없을 때
+    """
+    if os.path.splitext(storage_path)[1].lower() not in ['.xlsx', '.xls', '.csv']:
+        return None
+    
+    # get_blob 한 번으로 존재 확인과 메타데이터(md5 해시, generation) 비교
+    # (읽기가 끝날 때까지 다른 스레드의 캐시 용량 정리가 이 파일을 지우지 않도록 고정)
+    with pinned_blob_file(storage.bucket(), storage_path) as (local_path, md5):
+        # 데이터프레임 로드 (같은 내용의 파일은 캐시에서 바로 읽음)
+        return read_with_cache(local_path, read_spreadsheet, expected_md5=md5, reader_key=reader_signature())
+
+# 방의 공유 파일을 여러 스레드로 동시에 불러오기
+def load_room_files(files, progress=None, max_workers=None):
+    """
+    get_all_uploaded_files()로 한 번에 받은 메타데이터(storage_path)를 사용해
+    파일마다 메타데이터를 다시 조회하지 않고 다운로드와 읽기를 병렬로 처리
+    (한 파일이 실패해도 나머지는 계속 불러옴)
+
+    Args:
+        files: get_all_uploaded_files() 결과 중 불러올 파일 목록
+        progress: update()/finish()를 가진 진행률 표시기 (메인 스레드에서만 호출)
+        max_workers: 동시에 처리할 파일 수 (기본: STORAGE_DOWNLOAD_WORKERS)
+
+    Returns:
+        (불러온 (파일 정보, 데이터프레임) 목록 - files 순서 유지, 실패한 (파일 정보, 오류 메시지) 목록)
+    """
+    max_workers = max_workers or STORAGE_DOWNLOAD_WORKERS
+    
+    results = {}
+    errors = []
+    storage_jobs = [(i, file) for i, file in enumerate(files) if file.get("storage_path")]
+    if storage_jobs:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(storage_jobs)))) as executor:
+            futures = {
+                executor.submit(fetch_storage_file, file["storage_path"]): (i, file)
+                for i, file in storage_jobs
+            }
+            for future in as_completed(futures):
+                i, file = futures[future]
+                try:
+                    df = future.result()
+                    if df is not None:
+                        results[i] = df
+                    else:
+                        errors.append((file, "지원하지 않는 파일 형식입니다"))
+                except FileNotFoundError:
+                    errors.append((file, "클라우드 저장소에서 파일을 찾을 수 없습니다"))
+                except Exception as e:
+                    logging.error(f"파일 불러오기 실패: {file['storage_path']} - {e}")
+                    errors.append((file, str(e)))
+                if progress is not None:
+                    progress.update()
+    
+    # 저장 경로가 기록되지 않은 예전 파일은 기존 방식으로 하나씩 불러옴
+    for i, file in enumerate(files):
+        if file.get("storage_path"):
+            continue
+        df = download_firebase_file(file["user_id"], file["filename"])
+        if df is not None:
+            results[i] = df
+        else:
+            errors.append((file, "파일을 불러오지 못했습니다"))
+        if progress is not None:
+            progress.update()
+    
+    if progress is not None:
+        progress.finish()
+    loaded = [(file, results[i]) for i, file in enumerate(files) if i in results]
+    return loaded, errors
+
 # 공유된 파일 데이터 가져오기 (Storage에서 다운로드)
 def download_firebase_file(user_id, filename):
     global firebase_available
@@ -305,9 +473,9 @@ def download_firebase_file(user_id, filename):
         if not school_code:
             return None
             
-        # 1. 파일 메타데이터 조회
+        # 1. 파일 메타데이터 조회 (현재 방의 경로에서)
         file_key = filename.replace('.', '_')
-        file_meta = db.reference(f"file_uploads/{school_code}/{file_key}").get()
+        file_meta = cached_get(db, file_uploads_path(school_code, st.session_state.get("room_id"), file_key))
         
         if not file_meta:
             # 예전 방식(session 저장) 시도
@@ -318,28 +486,9 @@ def download_firebase_file(user_id, filename):
         if not storage_path:
              storage_path = f"uploads/{school_code}/{filename}" # 구버전 호환
         
-        # 로컬 저장 경로
-        local_dir = os.path.join("uploads", school_code)
-        os.makedirs(local_dir, exist_ok=True)
-        local_path = os.path.join(local_dir, filename)
-        
-        # 이미 존재하면 다운로드 건너뛰기 (선택 사항)
-        # if os.path.exists(local_path): ...
-        
-        bucket = storage.bucket()
-        blob = bucket.blob(storage_path)
-        
-        if blob.exists():
-            blob.download_to_filename(local_path)
-            logging.info(f"Storage에서 파일 다운로드 완료: {local_path}")
-            
-            # 데이터프레임 로드
-            file_ext = os.path.splitext(filename)[1].lower()
-            if file_ext in ['.xlsx', '.xls']:
-                return pd.read_excel(local_path)
-            elif file_ext == '.csv':
-                return pd.read_csv(local_path)
-        else:
+        try:
+            return fetch_storage_file(storage_path)
+        except FileNotFoundError:
             st.warning(f"클라우드 저장소에서 파일 {filename}을 찾을 수 없습니다.")
             return None
             
@@ -354,7 +503,7 @@ def download_old_session_file(user_id, filename):
     try:
         file_key = filename.replace('.', '_')
         dates_path = f"sessions/{st.session_state.work_session_id}/file_data/{user_id}/{file_key}"
-        result = db.reference(dates_path).get()
+        result = cached_get(db, dates_path)
         
         if result and 'dates' in result:
             date_values = result['dates']
@@ -383,8 +532,82 @@ def reset_session():
     except Exception as e:
         st.error(f"세션 초기화 중 오류 발생: {e}")
         return False
-# 모든 업로드된 파일 가져오기
-def get_all_uploaded_files():
+# 파일 메타데이터 구조: file_uploads/{school_code}/{room_id}/{file_key}
+# (방을 정하지 않고 올린 파일은 NO_ROOM_KEY 아래에 모음)
+NO_ROOM_KEY = "_no_room"
+# 버전 3: 방별 파일 수(file_upload_counts) 추가, 버전 4: 내용 해시별 참조 수(content_refs) 추가
+FILE_UPLOADS_LAYOUT_VERSION = 4
+
+def file_uploads_path(school_code, room_id=None, file_key=None):
+    path = f"file_uploads/{school_code}/{room_id or NO_ROOM_KEY}"
+    return f"{path}/{file_key}" if file_key else path
+
+# 방별 파일 수: file_upload_counts/{school_code}/{room_id} (메타데이터를 쓰거나 지울 때 함께 갱신)
+def file_count_path(school_code, room_id=None):
+    return f"file_upload_counts/{school_code}/{room_id or NO_ROOM_KEY}"
+
+# 내용 해시별 참조 수: content_refs/{school_code}/{content_sha256} (같은 내용을 가리키는 메타데이터 수)
+def content_ref_path(school_code, content_sha256):
+    return f"content_refs/{school_code}/{content_sha256}"
+
+# 서버에서 더하는 값 (다중 경로 업데이트 안에서 카운터를 원자적으로 증감)
+def server_increment(delta):
+    return {".sv": {"increment": delta}}
+
+def _is_file_metadata(value):
+    return isinstance(value, dict) and ("filename" in value or "storage_path" in value)
+
+# 예전 구조(file_uploads/{school_code}/{file_key})의 메타데이터를 방별 구조로 한 번만 옮김
+def ensure_file_uploads_layout(school_code):
+    """
+    학교별 구조 버전 표시(file_uploads_layout/{school_code})가 현재 버전이 아니면 학교 전체를 한 번 읽어
+    예전 구조의 항목을 방별 경로로 옮기고 방별 파일 수와 내용 해시별 참조 수를 새로 셈
+    (옮기기, 예전 항목 삭제, 수와 버전 기록은 한 번의 다중 경로 업데이트로 처리)
+    """
+    migrated = st.session_state.setdefault("file_uploads_migrated", set())
+    if school_code in migrated:
+        return
+    marker_path = f"file_uploads_layout/{school_code}"
+    if cached_get(db, marker_path) != FILE_UPLOADS_LAYOUT_VERSION:
+        school_data = cached_get(db, f"file_uploads/{school_code}") or {}
+        if isinstance(school_data, list):
+            school_data = dict(enumerate(school_data))
+        updates = {}
+        files = []
+        moved_count = 0
+        for file_key, file_info in school_data.items():
+            if _is_file_metadata(file_info):
+                room_key = file_info.get('room_id') or NO_ROOM_KEY
+                updates[file_uploads_path(school_code, room_key, file_key)] = file_info
+                updates[f"file_uploads/{school_code}/{file_key}"] = None
+                files.append((room_key, file_info))
+                moved_count += 1
+            elif isinstance(file_info, dict):
+                # 이미 방별 구조인 방
+                files.extend((str(file_key), value) for value in file_info.values() if _is_file_metadata(value))
+        room_counts = {}
+        content_refs = {}
+        for room_key, file_info in files:
+            room_counts[room_key] = room_counts.get(room_key, 0) + 1
+            if file_info.get("content_sha256"):
+                content_refs[file_info["content_sha256"]] = content_refs.get(file_info["content_sha256"], 0) + 1
+        updates[f"file_upload_counts/{school_code}"] = room_counts or None
+        updates[f"content_refs/{school_code}"] = content_refs or None
+        updates[marker_path] = FILE_UPLOADS_LAYOUT_VERSION
+        cached_update(db, "", updates)
+        if moved_count:
+            logging.info(f"파일 메타데이터 {moved_count}개를 방별 구조로 이동: {school_code}")
+    migrated.add(school_code)
+
+# 한 방의 업로드된 파일 가져오기
+def get_all_uploaded_files(room_id=None):
+    """
+    Args:
+        room_id: 방 ID (없으면 방을 정하지 않고 올린 파일)
+
+    Returns:
+        파일 정보 목록 (해당 방의 메타데이터만 읽음)
+    """
     global firebase_available
     
     if firebase_available:
@@ -392,13 +615,12 @@ def get_all_uploaded_files():
         if not school_code:
             return []
 
-        files_path = f"file_uploads/{school_code}"
         try:
-            files_data = db.reference(files_path).get()
+            ensure_file_uploads_layout(school_code)
+            files_data = cached_get(db, file_uploads_path(school_code, room_id))
             
             all_files = []
             if files_data:
-                # 기존 구조: file_uploads/{school}/{file_key} = metadata
                 if isinstance(files_data, dict):
                     items_iter = files_data.items()
                 elif isinstance(files_data, list):
@@ -415,6 +637,8 @@ def get_all_uploaded_files():
                         "filename": file_info.get("filename", "알 수 없는 파일"),
                         "upload_time": file_info.get("upload_time", 0),
                         "storage_path": file_info.get("storage_path", ""),
+                        "content_sha256": file_info.get("content_sha256"),
+                        "school_name": file_info.get("school_name"),
                         "room_id": file_info.get("room_id", None)  # room_id 추가
                     })
             
@@ -425,13 +649,35 @@ def get_all_uploaded_files():
             return []
     return []
 
+# 방별 파일 수 (업로드/삭제 때 함께 갱신되는 파일 수 노드를 한 번에 읽음)
+def get_room_file_counts(school_code):
+    ensure_file_uploads_layout(school_code)
+    counts = cached_get(db, f"file_upload_counts/{school_code}") or {}
+    return {
+        room_key: int(count) for room_key, count in counts.items()
+        if isinstance(count, (int, float)) and count > 0
+    }
+
+# 내용 해시가 같은 파일은 처음 업로드된 것 하나만 남김 (해시가 없는 예전 파일은 그대로)
+def unique_content_files(files):
+    seen = set()
+    unique_files = []
+    for file in sorted(files, key=lambda f: str(f.get("upload_time", ""))):
+        content_sha256 = file.get("content_sha256")
+        if content_sha256:
+            if content_sha256 in seen:
+                continue
+            seen.add(content_sha256)
+        unique_files.append(file)
+    return unique_files
+
 # 세션 상태 업데이트 - 방 단위
 def update_session_state(state):
     global firebase_available
     
     if firebase_available and st.session_state.room_id:
         try:
-            db.reference(f"rooms/{st.session_state.school_code}/{st.session_state.room_id}/state").set(state)
+            cached_set(db, f"rooms/{st.session_state.school_code}/{st.session_state.room_id}/state", state)
         except Exception as e:
             st.warning(f"세션 상태 업데이트 실패: {e}")
             firebase_available = False
@@ -442,7 +688,9 @@ def get_session_state():
     
     if firebase_available and st.session_state.room_id:
         try:
-            state = db.reference(f"rooms/{st.session_state.school_code}/{st.session_state.room_id}/state").get()
+            # 방 노드 전체를 읽어 두면 같은 실행의 참여자/방 정보 조회는 캐시에서 꺼내 씀
+            room_info = get_room_data(st.session_state.school_code, st.session_state.room_id)
+            state = room_info.get("state")
             return state if state else "start"
         except Exception as e:
             # st.warning(f"세션 상태 조회 실패: {e}") # 조용히 처리
@@ -450,11 +698,15 @@ def get_session_state():
     return "start"
 
 # 협업 방/참여자 관리 유틸
+def get_room_data(school_code, room_id):
+    """방 노드 전체 (상태, 참여자, 설정) - 캐시를 거쳐 읽음"""
+    return cached_get(db, f"rooms/{school_code}/{room_id}") or {}
+
 def get_rooms_for_school(school_code):
     if not firebase_available or not school_code:
         return {}
     try:
-        data = db.reference(f"rooms/{school_code}").get()
+        data = cached_get(db, f"rooms/{school_code}")
         return data or {}
     except Exception:
         return {}
@@ -486,14 +738,13 @@ def create_room(school_code, required_count, room_name, room_password=None):
         
         # 비밀번호가 제공된 경우 해시하여 저장
         if room_password and room_password.strip():
-            import hashlib
             hashed_password = hashlib.sha256(room_password.strip().encode()).hexdigest()
             room_data["password_hash"] = hashed_password
             room_data["has_password"] = True
         else:
             room_data["has_password"] = False
             
-        db.reference(f"rooms/{school_code}/{room_id}").set(room_data)
+        cached_set(db, f"rooms/{school_code}/{room_id}", room_data)
         return room_id
     except Exception as e:
         logging.error(f"방 생성 실패: {e}")
@@ -506,7 +757,7 @@ def join_room(school_code, room_id):
         participants_path = f"rooms/{school_code}/{room_id}/participants/{st.session_state.session_id}"
         
         # 기존 참여자 정보 확인
-        existing_participant = db.reference(participants_path).get()
+        existing_participant = cached_get(db, participants_path)
         
         # 업데이트할 데이터 준비
         update_data = {
@@ -520,11 +771,11 @@ def join_room(school_code, room_id):
             update_data["uploaded"] = False
         # 기존 참여자면 uploaded 상태 유지 (업데이트하지 않음)
         
-        db.reference(participants_path).update(update_data)
+        cached_update(db, participants_path, update_data)
         
         st.session_state.work_session_id = room_id  # 기존 세션 ID를 방 ID로 사용 (호환성)
         # 방 이름 저장
-        room_info = db.reference(f"rooms/{school_code}/{room_id}").get() or {}
+        room_info = get_room_data(school_code, room_id)
         st.session_state.room_name = room_info.get("room_name", room_id)
         return True
     except Exception:
@@ -533,7 +784,7 @@ def join_room(school_code, room_id):
 def mark_uploaded_done(school_code, room_id):
     if not firebase_available or not school_code or not room_id:
         return
-    db.reference(f"rooms/{school_code}/{room_id}/participants/{st.session_state.session_id}").update({
+    cached_update(db, f"rooms/{school_code}/{room_id}/participants/{st.session_state.session_id}", {
         "uploaded": True,
         "updated_at": int(time.time())
     })
@@ -544,7 +795,7 @@ def get_room_status(school_code, room_id):
     """
     if not firebase_available or not school_code or not room_id:
         return None, 0, 0
-    room_ref = db.reference(f"rooms/{school_code}/{room_id}").get() or {}
+    room_ref = get_room_data(school_code, room_id)
     participants = room_ref.get("participants", {}) or {}
     ready = sum(1 for p in participants.values() if p.get("uploaded"))
     total = len(participants)
@@ -566,7 +817,7 @@ def verify_room_password(school_code, room_id, password):
         return False
     
     try:
-        room_info = db.reference(f"rooms/{school_code}/{room_id}").get()
+        room_info = get_room_data(school_code, room_id)
         if not room_info:
             return False
         
@@ -576,7 +827,6 @@ def verify_room_password(school_code, room_id, password):
         
         # 비밀번호 확인
         if password and password.strip():
-            import hashlib
             hashed_input = hashlib.sha256(password.strip().encode()).hexdigest()
             stored_hash = room_info.get("password_hash", "")
             return hashed_input == stored_hash
@@ -586,6 +836,43 @@ def verify_room_password(school_code, room_id, password):
         logging.error(f"비밀번호 확인 실패: {e}")
         return False
 
+# 내용 해시의 참조 수를 1 늘리고 늘리기 전 값 돌려주기 (트랜잭션 - 업로드를 건너뛸지 정할 때 사용)
+def acquire_content_ref(school_code, content_sha256):
+    previous = 0
+
+    def add_ref(count):
+        nonlocal previous
+        previous = count if isinstance(count, (int, float)) and count > 0 else 0
+        return previous + 1
+
+    cached_transaction(db, content_ref_path(school_code, content_sha256), add_ref)
+    return previous
+
+# 참조 수가 0 이하가 된 내용 해시의 참조 노드 지우기 (트랜잭션 - 그 사이 같은 내용을 다시 올렸으면 유지)
+def release_content_ref(school_code, content_sha256):
+    """
+    Returns:
+        참조하는 파일이 없어 Storage 파일을 지워도 되면 True (확인하지 못하면 False - 공유 파일을 잘못 지우지 않도록)
+    """
+    released = False
+
+    def clear_if_unused(count):
+        nonlocal released
+        released = not (isinstance(count, (int, float)) and count > 0)
+        return None if released else count
+
+    try:
+        cached_transaction(db, content_ref_path(school_code, content_sha256), clear_if_unused)
+    except Exception as e:
+        logging.warning(f"파일 참조 수 확인 실패 (파일 유지): {content_sha256[:12]} - {e}")
+        return False
+    return released
+
+# 스레드별 Storage 클라이언트 (배치 요청은 클라이언트 단위로 쌓이므로 스레드끼리 공유하지 않음)
+def new_storage_client():
+    app = firebase_admin.get_app()
+    return gcs.Client(project=app.project_id, credentials=app.credential.get_credential())
+
 # 방 초기화 (강력한 cleanup 포함)
 def reset_room(school_code, room_id, password=None):
     global firebase_available
@@ -601,36 +888,58 @@ def reset_room(school_code, room_id, password=None):
     try:
         logging.info(f"방 초기화 시작: {room_id}")
         
-        # 1. 스토리지 파일 삭제
+        # 1. 삭제할 스토리지 파일 목록 만들기
         bucket = storage.bucket(name=STORAGE_BUCKET_NAME)
-        # 해당 방의 폴더 전체 삭제 (uploads/{school_code}/{room_id}/...)
+        # 예전 방식으로 방 폴더에 올린 파일 (uploads/{school_code}/{room_id}/...) - 이름만 받음
         prefix = f"uploads/{school_code}/{room_id}/"
-        blobs = bucket.list_blobs(prefix=prefix)
-        deleted_count = 0
-        for blob in blobs:
-            try:
-                blob.delete()
-                deleted_count += 1
-            except Exception as e:
-                logging.warning(f"Blob 삭제 실패: {blob.name} - {e}")
+        blob_names = [blob.name for blob in bucket.list_blobs(prefix=prefix, fields="items(name),nextPageToken")]
         
-        logging.info(f"스토리지 파일 {deleted_count}개 삭제 완료")
+        # 이 방의 파일이 가리키는 내용 해시별 파일 수 (참조 수에서 뺌)
+        ensure_file_uploads_layout(school_code)
+        files_data = cached_get(db, file_uploads_path(school_code, room_id)) or {}
+        removed_refs = {}
+        content_paths = {}
+        for file_val in files_data.values():
+            if isinstance(file_val, dict) and file_val.get("content_sha256"):
+                content_sha256 = file_val["content_sha256"]
+                removed_refs[content_sha256] = removed_refs.get(content_sha256, 0) + 1
+                content_paths[content_sha256] = file_val.get("storage_path")
         
-        # 2. 메타데이터(file_uploads) 삭제
-        # 전체를 뒤져서 해당 room_id인 것만 지워야 하는 비효율이 있지만,
-        # 현재 구조상 file_uploads/{school_code} 밑에 플랫하게 있음.
-        # 따라서 키를 순회하며 확인해야 함.
-        files_ref = db.reference(f"file_uploads/{school_code}")
-        files_data = files_ref.get()
-        if files_data:
-            for file_key, file_val in files_data.items():
-                if isinstance(file_val, dict) and file_val.get("room_id") == room_id:
-                    db.reference(f"file_uploads/{school_code}/{file_key}").delete()
+        # 2. 메타데이터(file_uploads), 파일 수, 참조 수와 방 데이터(rooms)를 한 번의 다중 경로 업데이트로 처리
+        cached_update(db, "", {
+            file_uploads_path(school_code, room_id): None,
+            file_count_path(school_code, room_id): None,
+            f"rooms/{school_code}/{room_id}": None,
+            **{
+                content_ref_path(school_code, content_sha256): server_increment(-count)
+                for content_sha256, count in removed_refs.items()
+            },
+        })
+        
+        # 내용 해시로 공유되는 파일은 참조 수가 0이 되었을 때만 삭제
+        # generation을 참조 수 확인보다 먼저 읽고 그 generation일 때만 지우므로, 그 사이 다른 방에서
+        # 다시 올린 파일(참조 수 0에서 늘린 업로드는 항상 새로 올림)은 지우지 않음
+        blob_generations = {}
+        for content_sha256, storage_path in content_paths.items():
+            try:
+                existing_blob = bucket.get_blob(storage_path) if storage_path else None
+            except Exception as e:
+                logging.warning(f"스토리지 파일 조회 실패 (파일 유지): {storage_path} - {e}")
+                continue
+            if release_content_ref(school_code, content_sha256) and existing_blob is not None:
+                blob_names.append(storage_path)
+                blob_generations[storage_path] = existing_blob.generation
         
-        # 3. 방 데이터(rooms) 삭제
-        db.reference(f"rooms/{school_code}/{room_id}").delete()
+        # 3. 스토리지 파일을 배치로 묶어 동시에 삭제
+        deleted_count, failed_names = delete_blobs(blob_names, new_storage_client, STORAGE_BUCKET_NAME,
+                                                   generations=blob_generations)
+        logging.info(f"스토리지 파일 {deleted_count}개 삭제 완료, {len(failed_names)}개 실패")
+        if failed_names:
+            st.warning(f"스토리지 파일 {len(blob_names)}개 중 {len(failed_names)}개를 삭제하지 못했습니다.")
         
-        # 4. 로컬 세션 클리어
+        # 4. 로컬 세션 클리어 (삭제된 방에 접속 상태를 다시 쓰지 않도록 접속 기록도 지움)
+        st.session_state.pop("presence", None)
+        forget_sessions(f"rooms/{school_code}/{room_id}")
         st.session_state.room_id = None
         st.session_state.room_name = None
         st.session_state.processing_step = "start"
@@ -650,13 +959,16 @@ def reset_session_legacy():
     pass
 
 # 관리자 전용: 모든 Firebase 데이터 삭제
-def admin_reset_all_firebase_data():
+def admin_reset_all_firebase_data(progress=None):
     """
     관리자 전용: Firebase의 모든 데이터를 영구적으로 삭제합니다.
     - Storage: 모든 업로드된 파일
     - Realtime DB: rooms, file_uploads, sessions 전체
     - 로컬 세션 상태
     
+    Args:
+        progress: Storage 삭제 진행 상황을 (삭제한 수, 실패한 수)로 받을 함수
+    
     Returns:
         tuple: (success: bool, result: int or str)
                success=True이면 result는 삭제된 파일 수
@@ -670,45 +982,40 @@ def admin_reset_all_firebase_data():
     try:
         logging.warning("⚠️ 관리자 전체 데이터 삭제 시작")
         
-        # 1. Firebase Storage 모든 파일 삭제
+        # 1. Firebase Storage 모든 파일 삭제 (목록을 페이지 단위로 받아 배치로 동시에 삭제)
         try:
             bucket = storage.bucket()
-            blobs = list(bucket.list_blobs())
-            deleted_count = 0
-            
-            for blob in blobs:
-                try:
-                    blob.delete()
-                    deleted_count += 1
-                    logging.info(f"Storage 파일 삭제: {blob.name}")
-                except Exception as e:
-                    logging.warning(f"Blob 삭제 실패: {blob.name} - {e}")
-            
-            logging.info(f"✅ Storage 파일 {deleted_count}개 삭제 완료")
+            deleted_count, failed_count = wipe_bucket(bucket, new_storage_client, progress=progress)
+            logging.info(f"✅ Storage 파일 {deleted_count}개 삭제 완료, {failed_count}개 실패")
         except Exception as e:
+            # 끝낸 페이지까지는 체크포인트에 남아 있으므로 다시 실행하면 이어서 삭제
             logging.error(f"Storage 삭제 중 오류: {e}")
-            deleted_count = 0
+            return False, f"Storage 삭제 중 오류 (다시 실행하면 중단된 지점부터 이어서 삭제합니다): {e}"
         
         # 2. Realtime Database 전체 노드 삭제
         try:
-            db.reference("rooms").delete()
+            cached_delete(db, "rooms")
             logging.info("✅ rooms 노드 삭제 완료")
         except Exception as e:
             logging.warning(f"rooms 삭제 중 오류: {e}")
         
         try:
-            db.reference("file_uploads").delete()
+            cached_delete(db, "file_uploads")
+            cached_delete(db, "file_upload_counts")
+            cached_delete(db, "content_refs")
+            cached_delete(db, "file_uploads_layout")
             logging.info("✅ file_uploads 노드 삭제 완료")
         except Exception as e:
             logging.warning(f"file_uploads 삭제 중 오류: {e}")
         
         try:
-            db.reference("sessions").delete()
+            cached_delete(db, "sessions")
             logging.info("✅ sessions 노드 삭제 완료")
         except Exception as e:
             logging.warning(f"sessions 삭제 중 오류: {e}")
         
-        # 3. 로컬 세션 상태 전체 초기화
+        # 3. 로컬 세션 상태 전체 초기화 (접속 기록 포함)
+        forget_sessions()
         keys_to_delete = list(st.session_state.keys())
         for key in keys_to_delete:
             try:
@@ -725,6 +1032,9 @@ def admin_reset_all_firebase_data():
         return False, error_msg
 
 
+# 이번 실행의 Realtime Database 읽기 캐시 초기화 (같은 경로는 실행마다 한 번만 읽음)
+begin_rerun()
+
 # 페이지 로드 시 사용자 상태 업데이트
 update_user_status()
 
@@ -763,42 +1073,25 @@ with st.sidebar:
             if 'school_list' in st.session_state and st.session_state.school_list:
                 school_info = next((s for s in st.session_state.school_list if s['SD_SCHUL_CODE'] == school_code), None)
             
-            # 파일 업로드 정보 가져오기
-            files_path = f"file_uploads/{school_code}"
-            files_data = db.reference(files_path).get()
+            # 파일 업로드 정보 가져오기 (방별 파일 수는 파일 수 노드, 파일 정보는 현재 방만)
+            room_file_counts = get_room_file_counts(school_code)
+            file_count = sum(room_file_counts.values())
             
-            if files_data:
-                unique_users = set()
-                file_count = 0
-                room_status = {}
-                
-                # 파일 메타데이터에서 사용자 ID 추출
-                for file_key, file_info in files_data.items():
-                    file_count += 1
-                    if 'upload_user' in file_info:
-                        unique_users.add(file_info['upload_user'])
-                    room_id = file_info.get("room_id") or "room:미지정"
-                    room_name = file_info.get("room_name") or room_id
-                    if room_id not in room_status:
-                        room_status[room_id] = {
-                            "room_name": room_name,
-                            "count": 0,
-                            "users": set()
-                        }
-                    room_status[room_id]["count"] += 1
-                    if 'upload_user' in file_info:
-                        room_status[room_id]["users"].add(file_info['upload_user'])
+            if file_count:
+                current_room_files = get_all_uploaded_files(st.session_state.get("room_id"))
+                # 파일 메타데이터에서 사용자 ID 추출 (현재 방)
+                unique_users = {file["user_id"] for file in current_room_files}
                 
                 # 학교 이름 표시
                 school_name = "알 수 없음"
                 if school_info:
                     school_name = f"{school_info['SCHUL_NM']} ({school_info['ATPT_OFCDC_SC_NM']})"
-                elif files_data and next(iter(files_data.values())).get('school_name'):
-                    school_name = next(iter(files_data.values())).get('school_name')
+                elif current_room_files and current_room_files[0].get('school_name'):
+                    school_name = current_room_files[0]['school_name']
                 
                 st.write(f"**{school_name}** 파일 공유 현황:")
                 st.write(f"- 공유된 파일 수: {file_count}개")
-                st.write(f"- 파일 공유 사용자 수: {len(unique_users)}명")
+                st.write(f"- 현재 방 파일 공유 사용자 수: {len(unique_users)}명")
 
                 # 방 상태(업로드 완료 인원) 표시
                 if st.session_state.get("room_id"):
@@ -809,10 +1102,14 @@ with st.sidebar:
                     st.write(f"- 업로드 완료: {ready_cnt}/{required if required else total_cnt or '미설정'}명")
                 
                 # 방별 파일 현황 표시
-                if room_status:
-                    st.write("방별 파일 공유 현황:")
-                    for rid, info in room_status.items():
-                        st.write(f"• {info['room_name']} ({rid}) - 파일 {info['count']}개, 업로드 사용자 {len(info['users'])}명")
+                rooms_info = get_rooms_for_school(school_code)
+                st.write("방별 파일 공유 현황:")
+                for rid, count in room_file_counts.items():
+                    if rid == NO_ROOM_KEY:
+                        room_name = "방 미지정"
+                    else:
+                        room_name = (rooms_info.get(rid) or {}).get("room_name", rid)
+                    st.write(f"• {room_name} ({rid}) - 파일 {count}개")
         except Exception as e:
             st.warning(f"학교 공유 정보 조회 실패: {e}")
     
@@ -875,6 +1172,16 @@ with st.sidebar:
         **⚠️ 복구 불가능합니다!**
         """)
         
+        # 중단된 삭제 작업이 있으면 안내 (다시 실행하면 이어서 진행)
+        if firebase_available:
+            try:
+                wipe_checkpoint = load_wipe_checkpoint(storage.bucket().name)
+            except Exception:
+                wipe_checkpoint = None
+            if wipe_checkpoint:
+                st.info(f"중단된 삭제 작업이 있습니다 (Storage 파일 {wipe_checkpoint['deleted']}개 삭제됨). "
+                        "다시 실행하면 중단된 지점부터 이어서 삭제합니다.")
+        
         admin_password = st.text_input(
             "관리자 비밀번호", 
             type="password", 
@@ -902,8 +1209,13 @@ with st.sidebar:
         # 최종 확인 버튼 (첫 번째 버튼을 클릭한 경우에만 표시)
         if st.session_state.get('admin_confirm_step', False):
             if st.button("⚠️ 확인했습니다. 모든 데이터를 삭제합니다.", type="secondary"):
+                wipe_status = st.empty()
+                
+                def show_wipe_progress(deleted, failed):
+                    wipe_status.info(f"Storage 파일 삭제 중... {deleted}개 삭제" + (f", {failed}개 실패" if failed else ""))
+                
                 with st.spinner("모든 데이터를 삭제하는 중..."):
-                    success, result = admin_reset_all_firebase_data()
+                    success, result = admin_reset_all_firebase_data(progress=show_wipe_progress)
                     
                 if success:
                     st.success(f"✅ 모든 Firebase 데이터 삭제 완료! (Storage 파일 {result}개 삭제)")
@@ -1172,15 +1484,9 @@ if selected_project == '이수 가능한 날짜 찾기':
 
     # 업로드된 파일 목록 표시
     if firebase_available and st.session_state.processing_step == 'start':
-        all_files = get_all_uploaded_files()
-        # 현재 방의 파일만 필터링
+        # 현재 방의 파일만 조회 (방이 없으면 방을 정하지 않고 올린 파일)
         current_room_id = st.session_state.get("room_id")
-        if current_room_id:
-            # 방이 설정되어 있으면 해당 방의 파일만 표시
-            display_files = [f for f in all_files if f.get("room_id") == current_room_id]
-        else:
-            # 방이 없으면 모든 파일 표시 (하위 호환성)
-            display_files = all_files
+        display_files = get_all_uploaded_files(current_room_id)
             
         if display_files:
             if current_room_id:
@@ -1227,31 +1533,38 @@ if selected_project == '이수 가능한 날짜 찾기':
             
             if len(current_files) == 0:  # 파일이 없으면 로드
                 with st.spinner("방의 업로드된 파일을 불러오는 중..."):
-                    all_files = get_all_uploaded_files()
-                    # 현재 방의 파일만 필터링
-                    room_files = [f for f in all_files if f.get("room_id") == st.session_state.room_id]
+                    # 현재 방의 파일만 조회
+                    room_files = get_all_uploaded_files(st.session_state.room_id)
                     
                     if room_files:
                         loaded_count = 0
-                        for file in room_files:
-                            # 파일 다운로드 및 로드
-                            df = download_firebase_file(file["user_id"], file["filename"])
-                            if df is not None:
-                                if school_code not in st.session_state.school_dataframes:
-                                    st.session_state.school_dataframes[school_code] = []
-                                
-                                # 중복 체크
-                                already_exists = any(
-                                    item['filename'] == file["filename"] 
-                                    for item in st.session_state.school_dataframes[school_code]
-                                )
-                                
-                                if not already_exists:
-                                    st.session_state.school_dataframes[school_code].append({
-                                        'dataframe': df,
-                                        'filename': file["filename"]
-                                    })
-                                    loaded_count += 1
+                        # 같은 내용의 파일은 한 번만 불러옴
+                        room_files = unique_content_files(room_files)
+                        download_progress = ThrottledProgress(
+                            st.progress(0), len(room_files), label="파일 불러오기", unit="개"
+                        )
+                        # 다운로드와 읽기는 여러 스레드로 동시에 처리하고 결과는 여기서 한 번에 반영
+                        loaded_files, failed_files = load_room_files(room_files, progress=download_progress)
+                        if school_code not in st.session_state.school_dataframes:
+                            st.session_state.school_dataframes[school_code] = []
+                        for file, df in loaded_files:
+                            # 중복 체크 (파일명 또는 내용 해시)
+                            already_exists = any(
+                                item['filename'] == file["filename"] or
+                                (file.get("content_sha256") and item.get('content_sha256') == file["content_sha256"])
+                                for item in st.session_state.school_dataframes[school_code]
+                            )
+                            
+                            if not already_exists:
+                                st.session_state.school_dataframes[school_code].append({
+                                    'dataframe': df,
+                                    'filename': file["filename"],
+                                    'upload_user': file["user_id"],
+                                    'content_sha256': file.get("content_sha256")
+                                })
+                                loaded_count += 1
+                        for file, message in failed_files:
+                            st.warning(f"파일 {file['filename']}을(를) 불러오지 못했습니다: {message}")
                         
                         if loaded_count > 0:
                             st.success(f"✅ {loaded_count}개의 파일을 불러왔습니다!")
@@ -1299,16 +1612,30 @@ if selected_project == '이수 가능한 날짜 찾기':
                         st.session_state.school_dataframes[school_code] = []
                     
                     try:
-                        df = pd.read_excel(uploaded_file)
-                        st.session_state.school_dataframes[school_code].append({'dataframe': df, 'filename': uploaded_file.name})
+                        df = read_spreadsheet(uploaded_file, filename=uploaded_file.name)
+                        known_hashes = {item.get('content_sha256') for item in st.session_state.school_dataframes[school_code]}
+                        content_sha256 = None
+                        shared = False
                         
-                        # Firebase에도 파일 저장
+                        # Firebase에도 파일 저장 (내용 해시는 저장하면서 계산한 값을 그대로 사용)
                         if firebase_available and db is not None:
                             try:
-                                save_uploaded_file(uploaded_file, school_code, school_info['SCHUL_NM'])
-                                st.success(f"{uploaded_file.name} 업로드 및 공유 성공!")
+                                saved = save_uploaded_file(uploaded_file, school_code, school_info['SCHUL_NM'], df=df, skip_hashes=known_hashes)
+                                content_sha256 = saved["content_sha256"]
+                                shared = True
                             except Exception as e:
                                 st.warning(f"{uploaded_file.name} 파일 공유 실패 (로컬에만 저장됨): {e}")
+                        if content_sha256 is None:
+                            content_sha256 = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+                        
+                        # 같은 내용의 파일이 이미 있으면 다시 추가하지 않음
+                        if content_sha256 in known_hashes:
+                            st.info(f"{uploaded_file.name}: 같은 내용의 파일이 이미 업로드되어 있습니다.")
+                            continue
+                        
+                        st.session_state.school_dataframes[school_code].append({'dataframe': df, 'filename': uploaded_file.name, 'upload_user': st.session_state.session_id, 'content_sha256': content_sha256})
+                        if shared:
+                            st.success(f"{uploaded_file.name} 업로드 및 공유 성공!")
                         else:
                             st.success(f"{uploaded_file.name} 로컬에 업로드 성공!")
                     except Exception as e:
@@ -1319,34 +1646,38 @@ if selected_project == '이수 가능한 날짜 찾기':
     # 데이터 처리 시작 시 Firebase의 파일 데이터 동기화
     if firebase_available and st.session_state.processing_step == 'converting' and 'all_files_loaded' not in st.session_state:
         with st.spinner("다른 사용자가 업로드한 파일을 로드 중..."):
-            all_files = get_all_uploaded_files()
-            # 현재 방의 파일만 필터링
+            # 현재 방의 파일만 조회 (방이 없으면 방을 정하지 않고 올린 파일)
             current_room_id = st.session_state.get("room_id")
-            if current_room_id:
-                # 방이 설정되어 있으면 해당 방의 파일만 로드
-                room_files = [f for f in all_files if f.get("room_id") == current_room_id]
-            else:
-                # 방이 없으면 모든 파일 로드 (하위 호환성)
-                room_files = all_files
+            room_files = get_all_uploaded_files(current_room_id)
             
-            for file in room_files:
-                # 이미 로컬에 있는 파일은 건너뜀
-                already_loaded = False
-                if school_code in st.session_state.school_dataframes:
-                    for loaded_file in st.session_state.school_dataframes[school_code]:
-                        if loaded_file.get('filename') == file["filename"]:
-                            already_loaded = True
-                            break
-                
-                if not already_loaded:
-                    df = download_firebase_file(file["user_id"], file["filename"])
-                    if df is not None:
-                        if school_code not in st.session_state.school_dataframes:
-                            st.session_state.school_dataframes[school_code] = []
-                        st.session_state.school_dataframes[school_code].append({
-                            'dataframe': df, 
-                            'filename': file["filename"]
-                        })
+            # 같은 내용의 파일은 한 번만 불러옴
+            room_files = unique_content_files(room_files)
+            # 이미 로컬에 있는 파일(파일명 또는 내용 해시가 같은 파일)은 건너뜀
+            loaded_items = st.session_state.school_dataframes.get(school_code, [])
+            room_files = [
+                file for file in room_files
+                if not any(
+                    loaded_file.get('filename') == file["filename"] or (
+                        file.get("content_sha256") and loaded_file.get('content_sha256') == file["content_sha256"])
+                    for loaded_file in loaded_items
+                )
+            ]
+            download_progress = ThrottledProgress(
+                st.progress(0), len(room_files), label="공유 파일 불러오기", unit="개"
+            )
+            # 다운로드와 읽기는 여러 스레드로 동시에 처리하고 결과는 여기서 한 번에 반영
+            loaded_files, failed_files = load_room_files(room_files, progress=download_progress)
+            if loaded_files and school_code not in st.session_state.school_dataframes:
+                st.session_state.school_dataframes[school_code] = []
+            for file, df in loaded_files:
+                st.session_state.school_dataframes[school_code].append({
+                    'dataframe': df, 
+                    'filename': file["filename"],
+                    'upload_user': file["user_id"],
+                    'content_sha256': file.get("content_sha256")
+                })
+            for file, message in failed_files:
+                st.warning(f"파일 {file['filename']}을(를) 불러오지 못했습니다: {message}")
         
         st.session_state.all_files_loaded = True
         if current_room_id:
@@ -1409,9 +1740,8 @@ if selected_project == '이수 가능한 날짜 찾기':
         else:
             st.info("아직 제외된 날짜가 없습니다.")
 
-    # 한국 공휴일 정보를 동적으로 가져오기
+    # 한국 공휴일 정보 (미리 계산해 둔 공휴일 표에서 읽음)
     # 현재 날짜를 기준으로 연도 판단 (3-2월 학년도 기준)
-    cal = SouthKorea()
     current_date = datetime.now()
     
     # 현재가 3월 이후면 현재 연도와 다음 연도, 3월 이전이면 전년도와 현재 연도
@@ -1422,8 +1752,8 @@ if selected_project == '이수 가능한 날짜 찾기':
         year_start = current_date.year - 1
         year_end = current_date.year
     
-    holidays_start = cal.holidays(year_start)
-    holidays_end = cal.holidays(year_end)
+    holidays_start = get_holidays(year_start)
+    holidays_end = get_holidays(year_end)
     all_holidays = holidays_start + holidays_end
     
     st.info(f"📅 공휴일 자동 제외: {year_start}년, {year_end}년 대한민국 공휴일이 자동으로 제외됩니다.")
@@ -1440,284 +1770,67 @@ if selected_project == '이수 가능한 날짜 찾기':
         
         st.info(f"총 {len(all_holidays)}개의 공휴일이 자동으로 제외됩니다.")
 
-    # 날짜 객체 정규화 함수
-    def normalize_date(date_obj):
-        """
-        다양한 날짜 객체 타입을 datetime.date 타입으로 통일
-        """
-        if pd.isna(date_obj):
-            return None
-        
-        if isinstance(date_obj, datetime):
-            return date_obj.date()
-        elif isinstance(date_obj, pd.Timestamp):
-            return date_obj.date()
-        elif isinstance(date_obj, str):
-            try:
-                return pd.to_datetime(date_obj).date()
-            except:
-                return None
-        else:
-            return date_obj  # 이미 date 객체이거나 처리할 수 없는 경우
-
-    # 날짜 처리 함수
-    def extract_date(date_string, is_period_column=False):
+    # 변환 기록 표시 함수
+    def show_conversion_trace(trace_df):
         """
-        다양한 형식의 날짜 문자열에서 날짜를 추출하는 함수
-        is_period_column: 출장기간/기간 컬럼 여부
-        
-        지원하는 날짜 형식:
-        - YYYY-MM-DD, YYYY.MM.DD, YYYY/MM/DD
-        - MM/DD/YYYY, DD.MM.YYYY
-        - YYYY년 MM월 DD일
-        - 엑셀 숫자 형식 (시리얼 날짜)
-        - 기간 형식 (YYYY.MM.DD HH:MM ~ YYYY.MM.DD HH:MM)
-        - datetime, Timestamp 객체
+        날짜 변환 기록을 필터와 페이지 단위로 하나의 표에 표시
+        (행마다 st.write를 호출하지 않아 행 수가 많아도 화면 요소는 하나)
         """
-        # NaN 또는 빈 값 처리
-        if pd.isna(date_string) or date_string == "" or date_string is None:
-            return None
-            
-        # 문자열이 아닌 경우 처리
-        if not isinstance(date_string, str):
-            try:
-                # 숫자인 경우 엑셀 시리얼 날짜로 처리
-                if isinstance(date_string, (int, float)):
-                    # 엑셀의 날짜 시리얼 번호 (1900년 1월 1일부터의 일수)
-                    # 엑셀은 1900-01-01을 1로 시작 (단, 버그로 1900년을 윤년으로 처리)
-                    if 1 <= date_string <= 2958465:  # 유효 범위 (1900-01-01 ~ 9999-12-31)
-                        # pandas의 엑셀 날짜 변환 사용
-                        excel_epoch = datetime(1899, 12, 30)  # 엑셀 epoch
-                        result_date = excel_epoch + timedelta(days=date_string)
-                        logger.info(f"엑셀 시리얼 날짜 변환 성공: {date_string} -> {result_date.date()}")
-                        return result_date.date()
-                
-                # datetime, Timestamp 등의 객체를 datetime.date로 변환
-                return normalize_date(date_string)
-            except Exception as e:
-                logger.debug(f"숫자/객체 변환 실패: {e}")
-                return None
+        filter_col1, filter_col2 = st.columns(2)
+        with filter_col1:
+            column_filter = st.multiselect(
+                "컬럼", options=list(trace_df['컬럼'].cat.categories), key="trace_column_filter"
+            )
+            result_filter = st.selectbox(
+                "결과", options=["전체", "성공", "실패"], key="trace_result_filter"
+            )
+        with filter_col2:
+            strategy_filter = st.multiselect(
+                "처리 단계", options=list(trace_df['단계'].cat.categories), key="trace_strategy_filter"
+            )
+            value_filter = st.text_input("원본 값 검색", key="trace_value_filter")
         
-        # 문자열 앞뒤 공백 제거
-        date_string = date_string.strip()
+        mask = pd.Series(True, index=trace_df.index)
+        if column_filter:
+            mask &= trace_df['컬럼'].isin(column_filter)
+        if strategy_filter:
+            mask &= trace_df['단계'].isin(strategy_filter)
+        if result_filter == "성공":
+            mask &= trace_df['성공']
+        elif result_filter == "실패":
+            mask &= ~trace_df['성공']
+        if value_filter:
+            mask &= trace_df['원본_값'].str.contains(value_filter, regex=False)
+        filtered = trace_df[mask]
         
-        # 빈 문자열 체크
-        if not date_string:
-            return None
+        page_col1, page_col2 = st.columns(2)
+        with page_col1:
+            page_size = st.selectbox("페이지당 행 수", options=[50, 100, 200, 500], index=1, key="trace_page_size")
+        page_count = max(1, -(-len(filtered) // page_size))
+        with page_col2:
+            page = st.number_input("페이지", min_value=1, max_value=page_count, value=1, step=1, key="trace_page")
         
-        try:
-            # 0. 로깅용 정보 출력
-            logger.info(f"날짜 추출 시도: '{date_string}'")
-            
-            # 1-0. 특수 컬럼(출장기간/기간) 처리
-            if is_period_column:
-                # 2025.04.23 14:00 ~ 2025.04.23 16:40 패턴 처리
-                if ' ~ ' in date_string:
-                    first_part = date_string.split(' ~ ')[0].strip()
-                    logger.debug(f"기간 컬럼 ~ 앞 부분: '{first_part}'")
-                    
-                    # 공백이 있는 경우 처리 (날짜+시간)
-                    if ' ' in first_part:
-                        date_part = first_part.split(' ')[0].strip()
-                        logger.debug(f"기간 컬럼 날짜 부분: '{date_part}'")
-                    else:
-                        date_part = first_part
-                    
-                    # 2025.04.23 형식
-                    if '.' in date_part:
-                        try:
-                            year, month, day = map(int, date_part.split('.'))
-                            logger.info(f"기간 컬럼 날짜 추출 성공: {year}-{month}-{day}")
-                            return datetime(year, month, day).date()
-                        except Exception as e:
-                            logger.debug(f"기간 컬럼 날짜 추출 실패(점 구분자): {e}")
-                    
-                    # 2025-04-23 형식
-                    elif '-' in date_part:
-                        try:
-                            year, month, day = map(int, date_part.split('-'))
-                            logger.info(f"기간 컬럼 날짜 추출 성공: {year}-{month}-{day}")
-                            return datetime(year, month, day).date()
-                        except Exception as e:
-                            logger.debug(f"기간 컬럼 날짜 추출 실패(하이픈 구분자): {e}")
-            
-            # 1. "YYYY.MM.DD HH:MM ~ YYYY.MM.DD HH:MM" 형식 처리
-            if ' ~ ' in date_string:
-                # '~' 기호 앞의 부분만 추출
-                first_part = date_string.split(' ~ ')[0].strip()
-                logger.debug(f"~ 기호 앞 부분: '{first_part}'")
-                
-                # 날짜와 시간이 있는 경우, 날짜 부분만 추출
-                if ' ' in first_part:
-                    date_part = first_part.split(' ')[0].strip()
-                    logger.debug(f"날짜 부분만 추출: '{date_part}'")
-                else:
-                    date_part = first_part
-                
-                # 점(.) 또는 하이픈(-) 구분자 있는지 확인
-                if '.' in date_part:
-                    # 2025.04.23 형식
-                    try:
-                        year, month, day = map(int, date_part.split('.'))
-                        logger.debug(f"날짜 추출 성공 (형식1): {year}-{month}-{day}")
-                        return datetime(year, month, day).date()
-                    except Exception as e:
-                        logger.debug(f"날짜 추출 실패 (형식1): {e}")
-                        pass  # 변환 실패 시 다음 단계로
-                elif '-' in date_part:
-                    # 2025-04-23 형식
-                    try:
-                        year, month, day = map(int, date_part.split('-'))
-                        logger.debug(f"날짜 추출 성공 (형식2): {year}-{month}-{day}")
-                        return datetime(year, month, day).date()
-                    except Exception as e:
-                        logger.debug(f"날짜 추출 실패 (형식2): {e}")
-                        pass  # 변환 실패 시 다음 단계로
-            
-            # 2. 단순 날짜 형식 (YYYY.MM.DD 또는 YYYY-MM-DD) 처리
-            if '.' in date_string and date_string.count('.') == 2:
-                # 2025.04.23 형식
-                try:
-                    parts = date_string.split('.')
-                    if len(parts) == 3 and len(parts[0]) == 4:  # 연도가 4자리인지 확인
-                        year, month, day = map(int, parts)
-                        logger.debug(f"날짜 추출 성공 (형식3): {year}-{month}-{day}")
-                        return datetime(year, month, day).date()
-                except Exception as e:
-                    logger.debug(f"날짜 추출 실패 (형식3): {e}")
-                    pass  # 변환 실패 시 다음 단계로
-            
-            if '-' in date_string and date_string.count('-') == 2:
-                # 2025-04-23 형식
-                try:
-                    parts = date_string.split('-')
-                    if len(parts) == 3 and len(parts[0]) == 4:  # 연도가 4자리인지 확인
-                        year, month, day = map(int, parts)
-                        logger.debug(f"날짜 추출 성공 (형식4): {year}-{month}-{day}")
-                        return datetime(year, month, day).date()
-                except Exception as e:
-                    logger.debug(f"날짜 추출 실패 (형식4): {e}")
-                    pass  # 변환 실패 시 다음 단계로
-            
-            # 3. 정규 표현식으로 날짜 부분 추출
-            date_pattern = r'\b(\d{4})[./-](\d{1,2})[./-](\d{1,2})\b'
-            match = re.search(date_pattern, date_string)
-            if match:
-                try:
-                    year, month, day = map(int, match.groups())
-                    logger.debug(f"날짜 추출 성공 (정규식): {year}-{month}-{day}")
-                    return datetime(year, month, day).date()
-                except Exception as e:
-                    logger.debug(f"날짜 추출 실패 (정규식): {e}")
-                    pass  # 변환 실패 시 다음 단계로
-            
-            # 4. pandas의 자동 변환 시도
-            try:
-                date_obj = pd.to_datetime(date_string)
-                logger.debug(f"날짜 추출 성공 (pandas): {date_obj.date()}")
-                return date_obj.date()
-            except Exception as e:
-                logger.debug(f"날짜 추출 실패 (pandas): {e}")
-                pass  # 변환 실패 시 다음 단계로
-            
-            # 5. 한글 날짜 형식 처리 (예: "2025년 4월 23일")
-            korean_pattern = r'(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일'
-            match = re.search(korean_pattern, date_string)
-            if match:
-                try:
-                    year, month, day = map(int, match.groups())
-                    logger.debug(f"날짜 추출 성공 (한글): {year}-{month}-{day}")
-                    return datetime(year, month, day).date()
-                except Exception as e:
-                    logger.debug(f"날짜 추출 실패 (한글): {e}")
-                    pass
-            
-            # 6. MM/DD/YYYY 형식 처리
-            if '/' in date_string and date_string.count('/') == 2:
-                try:
-                    parts = date_string.split('/')
-                    if len(parts) == 3:
-                        # MM/DD/YYYY 형식인지 DD/MM/YYYY 형식인지 판단
-                        if len(parts[2]) == 4:  # 세 번째가 연도 (MM/DD/YYYY)
-                            month, day, year = map(int, parts)
-                        elif len(parts[0]) == 4:  # 첫 번째가 연도 (YYYY/MM/DD)
-                            year, month, day = map(int, parts)
-                        else:
-                            # 불명확한 경우 MM/DD/YYYY로 가정
-                            month, day, year = map(int, parts)
-                        
-                        logger.debug(f"날짜 추출 성공 (슬래시 구분): {year}-{month}-{day}")
-                        return datetime(year, month, day).date()
-                except Exception as e:
-                    logger.debug(f"날짜 추출 실패 (슬래시 구분): {e}")
-                    pass
-            
-            # 7. 출장/휴가 특수 패턴 처리
-            vacation_pattern = r'(\d{4})-(\d{1,2})-(\d{1,2}) \d{1,2}:\d{1,2} ~ \d{4}-\d{1,2}-\d{1,2}'
-            if re.search(vacation_pattern, date_string):
-                try:
-                    parts = date_string.split(' ')[0].split('-')
-                    year, month, day = map(int, parts)
-                    logger.debug(f"날짜 추출 성공 (휴가 특수패턴): {year}-{month}-{day}")
-                    return datetime(year, month, day).date()
-                except Exception as e:
-                    logger.debug(f"날짜 추출 실패 (휴가 특수패턴): {e}")
-                    pass
-            
-            # 모든 변환 시도 실패
-            logger.warning(f"모든 방법으로 날짜 추출 실패: '{date_string}'")
-            return None
-                
-        except Exception as e:
-            # 변환 실패
-            logger.error(f"날짜 추출 중 예외 발생: {e}, 원본: '{date_string}'")
-            return None
+        start = (int(page) - 1) * page_size
+        st.dataframe(filtered.iloc[start:start + page_size], use_container_width=True, hide_index=True)
+        st.caption(f"전체 {len(trace_df)}건 중 {len(filtered)}건 ({page}/{page_count} 페이지)")
 
     # 날짜 처리 함수 수정
     def process_dates(existing_dates, school_code):
-        # 현재 날짜를 기준으로 학년도 시작/종료일 계산
-        current_date = datetime.now()
-        if current_date.month >= 3:
-            # 3월 이후: 현재 연도 3월 ~ 다음 연도 2월
-            start_date = datetime(current_date.year, 3, 1)
-            end_date = datetime(current_date.year + 1, 2, 28)
-        else:
-            # 3월 이전: 전년도 3월 ~ 현재 연도 2월
-            start_date = datetime(current_date.year - 1, 3, 1)
-            end_date = datetime(current_date.year, 2, 28)
-        
-        date_range = pd.date_range(start=start_date, end=end_date)
-        available_days = []
-        
-        vacations = st.session_state.school_vacations.get(school_code, {})
-        excluded_dates = st.session_state.school_excluded_dates.get(school_code, set())
-        
-        summer_vacation = vacations.get("summer", (None, None))
-        winter_vacation = vacations.get("winter", (None, None))
-        
-        # existing_dates의 각 날짜가 datetime.date 타입인지 확인하고 필요시 변환
-        existing_dates_set = set()
-        for date_obj in existing_dates:
-            if isinstance(date_obj, datetime):
-                existing_dates_set.add(date_obj.date())
-            elif isinstance(date_obj, pd.Timestamp):
-                existing_dates_set.add(date_obj.date())
-            else:
-                existing_dates_set.add(date_obj)  # 이미 date 객체인 경우
-        
-        for date in date_range:
-            curr_date = date.date()
-            if (curr_date.weekday() < 5 and 
-                curr_date not in [d for d, _ in all_holidays] and 
-                curr_date not in existing_dates_set and
-                curr_date not in excluded_dates and
-                not (summer_vacation[0] and summer_vacation[1] and summer_vacation[0] <= curr_date <= summer_vacation[1]) and
-                not (winter_vacation[0] and winter_vacation[1] and winter_vacation[0] <= curr_date <= winter_vacation[1])):
-                available_days.append(date)
-        
-        df = pd.DataFrame({'날짜': available_days})
-        df['요일'] = df['날짜'].dt.strftime('%A')
-        return df
+        """
+        학년도 날짜 배열과 마스크로 이용 가능한 날짜 계산
+
+        Returns:
+            (이용 가능한 날짜 데이터프레임, 학년도 날짜 배열, 날짜 마스크 dict)
+        """
+        calendar_days = academic_year_days()
+        masks = availability_masks(
+            calendar_days,
+            holidays=[d for d, _ in all_holidays],
+            busy_dates=existing_dates,
+            excluded_dates=st.session_state.school_excluded_dates.get(school_code, set()),
+            vacations=st.session_state.school_vacations.get(school_code, {})
+        )
+        return available_days_frame(calendar_days, masks['available']), calendar_days, masks
 
     # 데이터 처리 부분 수정
     st.subheader("6. 데이터 처리")
@@ -1787,10 +1900,14 @@ if selected_project == '이수 가능한 날짜 찾기':
                         # 리스트에서 데이터프레임만 추출
                         if isinstance(dataframes_info[0], dict) and 'dataframe' in dataframes_info[0]:
                             dataframes = [info['dataframe'] for info in dataframes_info]
+                            # 행마다 파일을 올린 참여자 (참여자별 가능 날짜 계산용)
+                            uploaders = [info.get('upload_user') or info.get('filename') for info in dataframes_info]
                         else:
                             dataframes = dataframes_info
+                            uploaders = [f"파일 {i + 1}" for i in range(len(dataframes))]
                             
                         combined_df = pd.concat(dataframes)
+                        row_owners = np.repeat(np.array(uploaders, dtype=object), [len(df) for df in dataframes])
                         
                         # 데이터 확인을 위한 조치
                         st.write("### 업로드된 모든 원본 데이터 (처리 전)")
@@ -1808,87 +1925,19 @@ if selected_project == '이수 가능한 날짜 찾기':
                         for i, col in enumerate(column_list):
                             st.write(f"{i+1}. `{col}`")
                         
-                        # 자동으로 날짜가 포함된 컬럼 찾기
+                        # 자동으로 날짜가 포함된 컬럼 찾기 (컬럼마다 표본 한 번으로 점수화)
                         st.write("#### 날짜 정보 포함 컬럼 자동 탐지")
-                        logger.info("날짜 컬럼 자동 탐지 시작")
-                        date_columns = []
+                        column_profiles = profile_date_columns(combined_df)
+                        date_columns = [profile['column'] for profile in column_profiles]
+                        logger.info("탐지된 날짜 컬럼 목록: %s", [(profile['column'], profile['score']) for profile in column_profiles])
                         
-                        # 1단계: datetime64 타입  컬럼 우선 선택
-                        for col in combined_df.columns:
-                            if pd.api.types.is_datetime64_any_dtype(combined_df[col]):
-                                date_columns.append(col)
-                                logger.info(f"datetime64 타입 컬럼 발견: {col}")
-                        
-                        # 2단계: 우선순위 키워드 검색 (출장기간, 기간)
-                        if not date_columns:  # datetime64 타입이 없으면 키워드 검색
-                            priority_keywords = ['출장기간', '기간']
-                            for col in combined_df.columns:
-                                col_lower = str(col).lower()
-                                if any(keyword in col_lower for keyword in priority_keywords):
-                                    date_columns.append(col)
-                                    logger.info(f"우선순위 키워드 '{col}' 컬럼 발견")
-                        
-                        # 3단계: 일반 날짜 관련 키워드 검색
-                        if not date_columns:  # 우선순위 컬럼이 없을 경우에만 다른 키워드 검색
-                            # 확장된 키워드 리스트
-                            date_keywords = ['날짜', 'date', '일자', '연가', '휴가', '조퇴', 
-                                            '반차', '시작일', '종료일', '일정', '근무', '출장']
-                            for col in combined_df.columns:
-                                col_lower = str(col).lower()
-                                if any(keyword in col_lower for keyword in date_keywords):
-                                    date_columns.append(col)
-                        
-                        # 4단계: 데이터 샘플을 확인하여 날짜 포맷이 포함된 컬럼 찾기
-                        
-                        # 3. 데이터 내용으로 찾기 (위에서 찾은 컬럼이 없을 경우)
-                        if not date_columns:
-                            for col in combined_df.columns:
-                                try:
-                                    # 데이터 샘플을 확인하여 날짜 포맷이 포함된 컬럼 찾기
-                                    sample_values = combined_df[col].dropna().astype(str).head(10).tolist()
-                                    
-                                    for val in sample_values:
-                                        # 문자열인지 확인하고 날짜 패턴이 포함되어 있는지 확인
-                                        if not isinstance(val, str):
-                                            continue
-                                        
-                                        # 2025.04.23 14:00 ~ 2025.04.23 16:40 같은 패턴 확인
-                                        if '~' in val and any(year in val for year in ['2025', '2026']):
-                                            date_pattern_match = re.search(r'(\d{4})[./-](\d{1,2})[./-](\d{1,2})', val)
-                                            if date_pattern_match:
-                                                date_columns.append(col)
-                                                logger.info(f"날짜 패턴 발견: {col}, 예시: {val}")
-                                                st.info(f"날짜 패턴이 발견된 컬럼: **{col}**, 예시: `{val}`")
-                                                break
-                                except Exception as e:
-                                    logger.error(f"컬럼 {col} 처리 중 오류: {e}")
-                        
-                        # 4. 출장부/휴가부 데이터 특수 처리 - 특정 패턴의 컬럼명 확인
-                        if not date_columns:
-                            special_date_columns = []
-                            for col in combined_df.columns:
-                                try:
-                                    if isinstance(col, str) and len(col) > 0:
-                                        # 출장부/휴가부 특수 형식 확인
-                                        if col.isnumeric() and int(col) < 20:  # 컬럼명이 숫자이고 작은 번호일 때 건너뛰기
-                                            continue
-                                        sample_values = combined_df[col].dropna().astype(str).head(5).tolist()
-                                        for val in sample_values:
-                                            if isinstance(val, str) and '~' in val and len(val) > 10:
-                                                if re.search(r'(\d{4})[-./](\d{1,2})[-./](\d{1,2})', val):
-                                                    special_date_columns.append(col)
-                                                    logger.info(f"특수 패턴 발견: {col}, 예시: {val}")
-                                                    st.info(f"특수 날짜 패턴이 발견된 컬럼: **{col}**, 예시: `{val}`")
-                                                    break
-                                except Exception as e:
-                                    logger.error(f"특수 컬럼 {col} 처리 중 오류: {e}")
-                            
-                            # 특수 컬럼 추가
-                            date_columns.extend(special_date_columns)
-                        
-                        # 두 리스트 병합 및 중복 제거
-                        date_columns = list(dict.fromkeys(date_columns))  # 중복 제거
-                        logger.info(f"탐지된 날짜 컬럼 목록: {date_columns}")
+                        if column_profiles:
+                            st.dataframe(pd.DataFrame({
+                                '컬럼명': [str(profile['column']) for profile in column_profiles],
+                                '점수': [profile['score'] for profile in column_profiles],
+                                '근거': [', '.join(profile['reasons']) for profile in column_profiles],
+                                '예시': [profile['example'] or '' for profile in column_profiles]
+                            }), use_container_width=True, hide_index=True)
                         
                         # 날짜 컬럼이 없으면 사용자에게 알리고 직접 선택하도록 함
                         if not date_columns:
@@ -1903,24 +1952,12 @@ if selected_project == '이수 가능한 날짜 찾기':
                             else:
                                 st.stop()
                         elif len(date_columns) > 1:
-                            # 우선순위 키워드가 포함된 컬럼을 먼저 선택 (기본값으로 설정)
-                            default_indices = []
-                            for i, col in enumerate(date_columns):
-                                col_lower = str(col).lower()
-                                if "출장기간" in col_lower or "기간" in col_lower:
-                                    default_indices.append(i)
-                            
-                            # 기본 선택 항목이 없으면 첫 번째 항목 선택
-                            if not default_indices and date_columns:
-                                default_indices = [0]
-                            
-                            default_selections = [date_columns[i] for i in default_indices]
-                            
+                            # 점수 순위대로 나열하고 점수가 높은 컬럼을 기본값으로 선택
                             st.warning(f"여러 개의 날짜 관련 컬럼이 발견되었습니다: {date_columns}")
                             selected_date_columns = st.multiselect(
                                 "사용할 날짜 컬럼 선택 (여러 개 선택 가능)", 
                                 options=date_columns,
-                                default=default_selections
+                                default=default_date_columns(column_profiles)
                             )
                             
                             if not selected_date_columns:
@@ -1944,81 +1981,61 @@ if selected_project == '이수 가능한 날짜 찾기':
                         combined_df['원본_날짜'] = combined_df['날짜'].copy().astype(str)
                         logger.info("원본 날짜 컬럼을 별도로 저장했습니다.")
                         
+                        # 진행 상태 표시
+                        progress = ThrottledProgress(
+                            st.progress(0), len(combined_df) * len(date_columns), label="날짜 추출", unit="건"
+                        )
+                        
+                        # 컬럼 단위로 한 번에 날짜 추출 (앞쪽 컬럼에서 추출된 행은 다음 컬럼에서 건너뜀)
+                        extraction_df, attempts, column_formats = extract_dates(
+                            combined_df, date_columns,
+                            progress_callback=lambda done, total: progress.update(done)
+                        )
+                        progress.finish()
+                        # 값마다 로그를 남기지 않고 변환 한 번에 요약 한 줄만 기록
+                        log_extraction_summary(attempts, column_formats)
+                        
                         # 결과를 저장할 데이터프레임 생성
                         result_df = pd.DataFrame({
                             '원본_날짜': combined_df['원본_날짜'],
-                            '추출된_날짜': None,
-                            '사용된_컬럼': None  # 어떤 컬럼에서 날짜가 추출되었는지 추적
+                            '추출된_날짜': extraction_df['추출된_날짜'],
+                            '추출된_종료_날짜': extraction_df['추출된_종료_날짜'],  # 기간 값의 종료일
+                            '사용된_컬럼': extraction_df['사용된_컬럼']  # 어떤 컬럼에서 날짜가 추출되었는지 추적
                         })
                         
-                        # 진행 상태 표시
-                        progress_bar = st.progress(0)
-                        total_rows = len(combined_df)
-                        
-                        # 각 행마다 날짜 추출 시도
-                        success_count = 0
-                        fail_count = 0
-                        fail_examples = []
-                        
-                        # 변환 결과를 디버깅용으로 저장
-                        debug_results = []
+                        extracted_mask = result_df['추출된_날짜'].notna()
+                        success_count = int(extracted_mask.sum())
+                        fail_count = len(result_df) - success_count
+                        fail_examples = result_df.loc[~extracted_mask, '원본_날짜'].head(5).tolist()
                         
-                        # 각 행 처리 (선택된 모든 컬럼에 대해 시도)
-                        for i, row in combined_df.iterrows():
-                            extracted_date = None
-                            source_column = None
-                            
-                            # 선택된 모든 컬럼에 대해 시도
-                            for col in date_columns:
-                                # 원본 날짜 값
-                                orig_date = row[col] if col in row else None
-                                
-                                if pd.isna(orig_date) or orig_date == "":
-                                    continue
-                                
-                                # 디버깅용 메시지 출력
-                                debug_info = f"처리 중: 행 {i}, 컬럼 '{col}', 값: '{orig_date}' (타입: {type(orig_date)})"
-                                debug_results.append(debug_info)
-                                
-                                # 컬럼 특성에 따라 is_period_column 설정
-                                is_period_column = False
-                                col_lower = str(col).lower()
-                                if any(keyword in col_lower for keyword in ['출장기간', '기간', '휴가기간']):
-                                    is_period_column = True
-                                
-                                # 날짜 추출 시도
-                                date_result = extract_date(orig_date, is_period_column=is_period_column)
-                                
-                                # 날짜가 추출되면 저장하고 다음 행으로
-                                if date_result is not None:
-                                    extracted_date = date_result
-                                    source_column = col
-                                    debug_results.append(f"  → 변환 성공: {extracted_date} (컬럼: {col})")
-                                    break
-                                else:
-                                    debug_results.append(f"  → 변환 실패 (컬럼: {col})")
-                            
-                            # 결과 저장
-                            if extracted_date is not None:
-                                result_df.at[i, '추출된_날짜'] = extracted_date
-                                result_df.at[i, '사용된_컬럼'] = source_column
-                                success_count += 1
-                            else:
-                                fail_count += 1
-                                if len(fail_examples) < 5:
-                                    fail_examples.append(row['원본_날짜'])
-                            
-                            # 진행 상태 업데이트
-                            progress_bar.progress(min((i + 1) / total_rows, 1.0))
-                        
-                        # 디버깅 정보 (토글로 숨겨서 표시)
+                        # 디버깅 정보 (토글로 숨겨서 표시 - 켰을 때만 표를 만듦)
                         with st.expander("변환 과정 디버깅 정보"):
-                            for debug_line in debug_results:
-                                st.write(debug_line)
+                            if st.toggle("변환 기록 표 보기", key="show_conversion_trace"):
+                                show_conversion_trace(build_trace_table(attempts))
                         
                         # 추출 결과 통계 표시
                         st.write(f"날짜 추출 결과: 성공 {success_count}건, 실패 {fail_count}건")
                         
+                        # 날짜 변환 캐시 적중률 (프로세스 전체 누적)
+                        cache_info = extract_date_cache_info()
+                        logger.info(f"날짜 변환 캐시: 적중 {cache_info.hits}, 미적중 {cache_info.misses}, 크기 {cache_info.currsize}/{cache_info.maxsize}")
+                        st.caption(f"날짜 변환 캐시: 적중 {cache_info.hits}건, 미적중 {cache_info.misses}건 (저장된 값 {cache_info.currsize}/{cache_info.maxsize}개)")
+                        
+                        # 컬럼별 감지된 날짜 형식과 기존 경로(전체 단계) 처리 비율
+                        st.write("### 컬럼별 날짜 형식 감지 결과")
+                        format_rows = []
+                        for format_info in column_formats:
+                            handled = format_info['parsed'] + format_info['fallback']
+                            fallback_rate = format_info['fallback'] / handled if handled else 0.0
+                            format_rows.append({
+                                '컬럼명': format_info['column'],
+                                '감지된 형식': format_info['label'],
+                                '빠른 처리 건수': format_info['parsed'],
+                                '전체 단계 처리 건수': format_info['fallback'],
+                                '전체 단계 비율': f"{fallback_rate:.1%}"
+                            })
+                        st.dataframe(pd.DataFrame(format_rows), use_container_width=True)
+                        
                         # 컬럼별 추출 성공 통계
                         if success_count > 0:
                             st.write("### 컬럼별 날짜 추출 성공 건수")
@@ -2038,10 +2055,13 @@ if selected_project == '이수 가능한 날짜 찾기':
                         result_df['추출된_날짜_문자열'] = result_df['추출된_날짜'].apply(
                             lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''
                         )
+                        result_df['종료_날짜_문자열'] = result_df['추출된_종료_날짜'].apply(
+                            lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else ''
+                        )
                         
                         # 처리 과정을 보여주기 위해 변환 결과 표시
                         st.write("### 날짜 변환 결과 확인")
-                        st.dataframe(result_df[['원본_날짜', '추출된_날짜_문자열', '사용된_컬럼']])
+                        st.dataframe(result_df[['원본_날짜', '추출된_날짜_문자열', '사용된_컬럼', '종료_날짜_문자열']])
                         
                         # 변환 결과 확인 버튼으로 다음 단계로 진행
                         if st.button("날짜 변환 결과 확인 완료", key="confirm_conversion"):
@@ -2063,8 +2083,28 @@ if selected_project == '이수 가능한 날짜 찾기':
                             
                             combined_df = combined_df.dropna(subset=['날짜'])
                             
-                            # 3. 중복 날짜 제거
-                            existing_dates = set(combined_df['날짜'])
+                            # 3. 기간(시작 ~ 종료)을 포함된 모든 날짜로 전개하고 중복 제거
+                            busy_starts = to_day_array(combined_df['날짜'])
+                            busy_ends = to_day_array(result_df.loc[combined_df.index, '추출된_종료_날짜'])
+                            busy_days = expand_intervals(busy_starts, busy_ends)
+                            existing_dates = set(busy_days.astype(object))
+                            
+                            # 날짜를 추출한 원본 값 (시각이 있는 기간 값의 시각을 읽기 위함)
+                            used_columns = result_df.loc[combined_df.index, '사용된_컬럼']
+                            used_values = pd.Series(None, index=combined_df.index, dtype=object)
+                            for col in date_columns:
+                                from_col = used_columns == col
+                                used_values[from_col] = combined_df.loc[from_col, col]
+                            busy_start_times, busy_end_times = interval_timestamps(used_values, busy_starts, busy_ends)
+                            
+                            # 참여자별 업무 기간 (결과 단계에서 참여자별 비트맵과 시간대 색인으로 변환)
+                            st.session_state.busy_intervals = pd.DataFrame({
+                                '참여자': row_owners[combined_df.index],
+                                '시작': busy_starts,
+                                '종료': busy_ends,
+                                '시작_시각': busy_start_times,
+                                '종료_시각': busy_end_times
+                            })
                             
                             # 최종 통계 표시
                             st.success(f"총 {len(existing_dates)}개의 고유한 날짜를 추출했습니다.")
@@ -2109,7 +2149,8 @@ if selected_project == '이수 가능한 날짜 찾기':
                             st.dataframe(date_df[['표시_날짜', '요일']])
                             
                             # 이용 가능한 날짜 계산
-                            available_days_df = process_dates(existing_dates, school_code)
+                            available_days_df, calendar_days, calendar_masks = process_dates(existing_dates, school_code)
+                            available_mask = calendar_masks['available']
                             
                             # 결과 표시
                             st.subheader("데이터 처리 결과")
@@ -2129,30 +2170,87 @@ if selected_project == '이수 가능한 날짜 찾기':
                             
                             # 월별 통계
                             st.write("### 월별 이용 가능한 날짜 수")
-                            monthly_stats = available_days_df['날짜'].dt.to_period('M').value_counts().sort_index()
-                            monthly_stats.index = monthly_stats.index.strftime('%Y-%m')
+                            monthly_stats = monthly_counts(calendar_days, available_mask)
                             st.bar_chart(monthly_stats)
                             
                             # 요일별 통계
                             st.write("### 요일별 이용 가능한 날짜 수")
-                            weekday_stats = available_days_df['요일'].value_counts()
+                            weekday_stats = weekday_counts(calendar_days, available_mask)
                             st.bar_chart(weekday_stats)
                             
-                            # 엑셀 파일로 저장
-                            output = io.BytesIO()
-                            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                                date_df.to_excel(writer, sheet_name='업로드된_날짜', index=False)
-                                available_days_df.to_excel(writer, sheet_name='이용_가능한_날짜', index=False)
+                            # 참여자별 가능 날짜 (한 명의 업무 때문에 날짜 전체를 버리지 않고 인원 기준으로 조회)
+                            busy_intervals = st.session_state.get('busy_intervals')
+                            if busy_intervals is not None and busy_intervals['참여자'].nunique() > 1:
+                                st.write("### 참여자별 가능 날짜")
+                                availability = AvailabilityBitmap.from_intervals(
+                                    calendar_days,
+                                    busy_intervals['참여자'],
+                                    busy_intervals['시작'].to_numpy(),
+                                    busy_intervals['종료'].to_numpy(),
+                                    participant_count=st.session_state.get('room_required_count', 0)
+                                )
+                                # 공휴일/방학/제외 날짜를 뺀 평일만 후보로 사용
+                                open_mask = calendar_masks['business'] & ~calendar_masks['vacation'] & ~calendar_masks['excluded']
+                                participant_count = availability.participant_count
+                                
+                                quorum_col, top_col = st.columns(2)
+                                with quorum_col:
+                                    quorum = st.slider(
+                                        "최소 가능 인원", min_value=1, max_value=participant_count,
+                                        value=participant_count, key="availability_quorum"
+                                    )
+                                    quorum_mask = availability.quorum_mask(quorum, open_mask)
+                                    quorum_days_df = available_days_frame(calendar_days, quorum_mask)
+                                    quorum_days_df['표시_날짜'] = quorum_days_df['날짜'].dt.date.apply(format_date)
+                                    st.dataframe(quorum_days_df[['표시_날짜', '요일']])
+                                    st.info(f"{participant_count}명 중 {quorum}명 이상 가능한 날짜: {len(quorum_days_df)}개")
+                                with top_col:
+                                    top_n = st.number_input(
+                                        "충돌이 적은 날짜 수", min_value=1, max_value=100, value=10, key="availability_top_n"
+                                    )
+                                    top_dates_df = availability.top_dates(int(top_n), open_mask)
+                                    top_dates_df['표시_날짜'] = top_dates_df['날짜'].dt.date.apply(format_date)
+                                    st.dataframe(top_dates_df[['표시_날짜', '가능_인원', '불가_인원']])
                             
-                            output.seek(0)
+                            # 시간대별 가능 여부 (하루 전체가 아닌 일정 시각과 겹치는지로 판단)
+                            if busy_intervals is not None and '시작_시각' in busy_intervals:
+                                st.write("### 시간대별 가능 여부")
+                                slot_col1, slot_col2, slot_col3 = st.columns(3)
+                                with slot_col1:
+                                    window_start = st.time_input("시작 시각", value=datetime.strptime(DEFAULT_WINDOW[0], '%H:%M').time(), key="slot_window_start")
+                                with slot_col2:
+                                    window_end = st.time_input("종료 시각", value=datetime.strptime(DEFAULT_WINDOW[1], '%H:%M').time(), key="slot_window_end")
+                                with slot_col3:
+                                    slot_minutes = st.selectbox("시간 단위(분)", options=[30, 60, 120], index=1, key="slot_minutes")
+                                
+                                interval_index = TimeIntervalIndex(busy_intervals['시작_시각'].to_numpy(), busy_intervals['종료_시각'].to_numpy())
+                                open_days = calendar_days[calendar_masks['business'] & ~calendar_masks['vacation'] & ~calendar_masks['excluded']]
+                                slots_df = slot_table(
+                                    interval_index, open_days,
+                                    window=(window_start.strftime('%H:%M'), window_end.strftime('%H:%M')),
+                                    slot_minutes=slot_minutes
+                                )
+                                free_slots_df = slots_df[slots_df['겹치는_일정'] == 0].copy()
+                                free_slots_df['표시_날짜'] = free_slots_df['날짜'].dt.date.apply(format_date)
+                                st.dataframe(free_slots_df[['표시_날짜', '시작', '종료']], hide_index=True)
+                                st.info(f"전체 {len(slots_df)}개 시간대 중 {len(free_slots_df)}개가 비어 있습니다.")
+                            
+                            # 결과 파일 내보내기 (버튼을 누를 때만 만들고, 같은 결과는 캐시에서 가져옴)
+                            export_format = st.radio(
+                                "내보내기 형식", options=available_export_formats(), horizontal=True, key="export_format"
+                            )
+                            export_data, export_ext, export_mime = deferred_export({
+                                '업로드된_날짜': date_df,
+                                '이용_가능한_날짜': available_days_df
+                            }, export_format)
                             
                             # 다운로드 버튼
                             now = datetime.now().strftime('%Y-%m-%dT%H-%M')
                             st.download_button(
                                 label=f"{school_info['SCHUL_NM']} 데이터 다운로드",
-                                data=output,
-                                file_name=f"{now}_export.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                                data=export_data,
+                                file_name=f"{now}_export.{export_ext}",
+                                mime=export_mime
                             )
                             
                             # 새로운 처리 시작 버튼
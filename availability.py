@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+참여자별 가능 날짜 - 업로드한 사용자마다 업무가 있는 날짜를 학년도 날짜 위의 비트로 저장하고
+"k명 이상 가능한 날짜", "충돌이 가장 적은 날짜 N개" 같은 질의를 비트 연산으로 계산
+"""
+
+import numpy as np
+import pandas as pd
+
+from date_extraction import expand_intervals
+
+# 0~255 각 바이트의 1비트 개수 (np.bitwise_count가 없는 numpy용)
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+    """uint64 배열 각 원소의 1비트 개수"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    return _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+class AvailabilityBitmap:
+    """
+    날짜 x 참여자 업무 비트맵
+
+    busy_bits[i, w]의 j번째 비트 = days[i]에 참여자 (w * 64 + j)가 업무가 있음
+    (참여자 한 명의 비트맵은 모든 날짜에서 같은 비트를 모은 것)
+    """
+
+    def __init__(self, days, participants, busy_bits, participant_count=None):
+        self.days = days
+        self.participants = list(participants)
+        self.busy_bits = busy_bits
+        # 파일을 올리지 않은 참여자도 인원에 포함할 수 있음 (업무가 없는 것으로 봄)
+        self.participant_count = max(len(self.participants), participant_count or 0)
+
+    @classmethod
+    def from_intervals(cls, days, owners, starts, ends=None, participant_count=None):
+        """
+        업무 기간 목록으로 비트맵 생성
+
+        Args:
+            days: 정렬된 datetime64[D] 날짜 배열 (학년도 달력)
+            owners: 각 기간을 업로드한 참여자 (starts와 같은 길이)
+            starts: 기간 시작 날짜 배열 (datetime64[D], NaT는 무시)
+            ends: 기간 종료 날짜 배열 (없거나 NaT면 하루)
+            participant_count: 전체 참여 인원 (업로드한 참여자 수보다 많으면 사용)
+        """
+        owners = pd.Series(owners, dtype=object).fillna('unknown').astype(str).to_numpy()
+        starts = np.asarray(starts, dtype='datetime64[D]')
+        ends = starts if ends is None else np.asarray(ends, dtype='datetime64[D]')
+        participants = sorted(set(owners))
+        busy_bits = np.zeros((len(days), max(1, -(-len(participants) // 64))), dtype=np.uint64)
+
+        for bit, participant in enumerate(participants):
+            own = owners == participant
+            busy_days = expand_intervals(starts[own], ends[own])
+            positions = np.searchsorted(days, busy_days)
+            in_range = positions < len(days)
+            positions = positions[in_range][days[positions[in_range]] == busy_days[in_range]]
+            busy_bits[positions, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+
+        return cls(days, participants, busy_bits, participant_count)
+
+    def busy_counts(self):
+        """날짜별 업무가 있는 참여자 수"""
+        return popcount(self.busy_bits).sum(axis=1, dtype=np.int64)
+
+    def free_counts(self):
+        """날짜별 가능한 참여자 수"""
+        return self.participant_count - self.busy_counts()
+
+    def participant_mask(self, participant):
+        """해당 참여자가 업무가 있는 날짜 마스크"""
+        bit = self.participants.index(participant)
+        word = self.busy_bits[:, bit // 64]
+        return ((word >> np.uint64(bit % 64)) & np.uint64(1)) == 1
+
+    def quorum_mask(self, k, base_mask=None):
+        """
+        k명 이상 가능한 날짜 마스크
+
+        Args:
+            k: 최소 가능 인원
+            base_mask: 함께 적용할 날짜 마스크 (예: 공휴일/방학을 제외한 평일)
+        """
+        mask = self.free_counts() >= k
+        return mask if base_mask is None else mask & base_mask
+
+    def top_dates(self, n, base_mask=None):
+        """
+        충돌(업무가 있는 참여자 수)이 가장 적은 날짜 N개 (충돌 수, 날짜순)
+
+        Returns:
+            '날짜', '가능_인원', '불가_인원' 컬럼 데이터프레임
+        """
+        busy = self.busy_counts()
+        candidates = np.arange(len(self.days)) if base_mask is None else np.flatnonzero(base_mask)
+        order = candidates[np.lexsort((candidates, busy[candidates]))][:n]
+        return pd.DataFrame({
+            '날짜': self.days[order].astype('datetime64[ns]'),
+            '가능_인원': self.participant_count - busy[order],
+            '불가_인원': busy[order],
+        })
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Storage 파일 로컬 캐시 - 내려받은 blob을 Storage 경로의 해시로 만든 경로에 보관하고,
+blob 메타데이터(md5, generation)가 같으면 다시 내려받지 않음 (전체 크기는 LRU로 제한)
+
+여러 스레드가 동시에 파일을 받아 읽으므로, 읽는 중인 파일은 pinned_blob_file로 고정해
+다른 스레드의 용량 정리에서 지워지지 않게 함
+"""
+
+import os
+import json
+import base64
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger('전학공앱')
+
+# 캐시 저장 위치와 최대 크기
+BLOB_CACHE_DIR = os.environ.get('BLOB_CACHE_DIR', os.path.join('cache', 'blobs'))
+BLOB_CACHE_MAX_BYTES = int(os.environ.get('BLOB_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+_lock = threading.Lock()
+# 사용 중인 캐시 파일 {경로: 고정한 수} - 용량 정리에서 제외
+_pinned = {}
+
+
+def blob_cache_path(storage_path):
+    """
+    Storage 경로에 대응하는 로컬 파일 경로
+
+    원본 파일명 대신 Storage 경로의 SHA-256 해시를 쓰므로 다른 방/학교의 같은 이름 파일이
+    서로 덮어쓰지 않음 (확장자는 파일 형식 판단을 위해 유지)
+    """
+    key = hashlib.sha256(storage_path.encode('utf-8')).hexdigest()
+    ext = os.path.splitext(storage_path)[1].lower()
+    return os.path.join(BLOB_CACHE_DIR, f"{key}{ext}")
+
+
+def _meta_path(path):
+    return f"{path}.json"
+
+
+def file_md5(path, chunk_size=1024 * 1024):
+    """파일의 MD5 해시 (Storage와 같은 base64 형식)"""
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+    return base64.b64encode(md5.digest()).decode('ascii')
+
+
+def _read_meta(path):
+    try:
+        with open(_meta_path(path), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_meta(path, storage_path, md5, generation):
+    with open(_meta_path(path), 'w', encoding='utf-8') as f:
+        json.dump({
+            'storage_path': storage_path,
+            'md5': md5,
+            'generation': generation,
+            'bytes': os.path.getsize(path),
+        }, f)
+
+
+def _is_current(path, blob):
+    """로컬 파일이 blob과 같은 내용인지 (기록된 md5/generation과 크기로 비교)"""
+    meta = _read_meta(path)
+    if meta is None or not os.path.exists(path):
+        return False
+    if blob.md5_hash is None and blob.generation is None:
+        return False
+    if blob.md5_hash is not None and meta.get('md5') != blob.md5_hash:
+        return False
+    if blob.generation is not None and meta.get('generation') != blob.generation:
+        return False
+    return blob.size is None or os.path.getsize(path) == blob.size
+
+
+def _remove(path):
+    for target in (path, _meta_path(path)):
+        try:
+            os.remove(target)
+        except FileNotFoundError:
+            pass
+
+
+def cached_blob_file(bucket, storage_path):
+    """
+    blob을 로컬 캐시를 거쳐 가져오기
+
+    메타데이터 조회(get_blob) 한 번으로 로컬 파일과 비교하고, 다를 때만 내려받음
+
+    Args:
+        bucket: Storage 버킷
+        storage_path: Storage 경로
+
+    Returns:
+        (로컬 파일 경로, blob의 MD5 해시)
+
+    Raises:
+        FileNotFoundError: Storage에 파일이 없을 때
+    """
+    blob = bucket.get_blob(storage_path)
+    if blob is None:
+        raise FileNotFoundError(storage_path)
+
+    path = blob_cache_path(storage_path)
+    if _is_current(path, blob):
+        # LRU 순서를 위해 사용 시각 갱신
+        os.utime(_meta_path(path))
+        logger.info("Storage 파일 캐시 사용: %s", storage_path)
+        return path, blob.md5_hash
+
+    os.makedirs(BLOB_CACHE_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=BLOB_CACHE_DIR, suffix='.tmp')
+    os.close(fd)
+    try:
+        blob.download_to_filename(temp_path)
+        os.replace(temp_path, path)
+    except Exception:
+        _remove(temp_path)
+        raise
+    _write_meta(path, storage_path, blob.md5_hash, blob.generation)
+    logger.info("Storage에서 파일 다운로드 완료: %s", storage_path)
+    evict_blob_cache(keep=(path,))
+    return path, blob.md5_hash
+
+
+@contextmanager
+def pinned_blob_file(bucket, storage_path):
+    """
+    cached_blob_file과 같지만 with 블록이 끝날 때까지 캐시 파일을 용량 정리에서 제외
+
+    사용 예:
+        with pinned_blob_file(bucket, storage_path) as (path, md5):
+            df = read(path)
+    """
+    path = blob_cache_path(storage_path)
+    with _lock:
+        _pinned[path] = _pinned.get(path, 0) + 1
+    try:
+        yield cached_blob_file(bucket, storage_path)
+    finally:
+        with _lock:
+            _pinned[path] -= 1
+            if not _pinned[path]:
+                del _pinned[path]
+
+
+def adopt_file(storage_path, source_path, md5=None, generation=None):
+    """
+    로컬 파일을 Storage 경로의 캐시 파일로 옮김 (업로드한 파일을 다시 내려받지 않도록)
+
+    Args:
+        storage_path: 파일이 저장된(또는 저장될) Storage 경로
+        source_path: 옮길 로컬 파일
+        md5: 파일의 MD5 (base64, 없으면 계산)
+        generation: blob의 generation (업로드에 실패해 모르면 None - 다음 조회 때 다시 내려받음)
+
+    Returns:
+        캐시 파일 경로
+    """
+    path = blob_cache_path(storage_path)
+    os.makedirs(BLOB_CACHE_DIR, exist_ok=True)
+    md5 = md5 or file_md5(source_path)
+    shutil.move(source_path, path)
+    _write_meta(path, storage_path, md5, generation)
+    evict_blob_cache(keep=(path,))
+    return path
+
+
+def evict_blob_cache(max_bytes=None, keep=()):
+    """
+    캐시 전체 크기가 최대 크기를 넘으면 가장 오래 사용하지 않은 파일부터 삭제
+
+    Args:
+        max_bytes: 최대 크기 (기본: BLOB_CACHE_MAX_BYTES)
+        keep: 지금 사용 중이라 지우면 안 되는 파일 경로 (pinned_blob_file로 고정한 파일도 지우지 않음)
+    """
+    max_bytes = BLOB_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        if not os.path.isdir(BLOB_CACHE_DIR):
+            return
+        entries = []
+        for name in os.listdir(BLOB_CACHE_DIR):
+            if name.endswith(('.json', '.tmp')):
+                continue
+            path = os.path.join(BLOB_CACHE_DIR, name)
+            try:
+                meta_path = _meta_path(path)
+                used = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0
+                entries.append((used, os.path.getsize(path), path))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if path in keep or path in _pinned:
+                continue
+            _remove(path)
+            total -= size
+            logger.info("Storage 파일 캐시 삭제 (용량 초과): %s", os.path.basename(path))
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+날짜 컬럼 탐지 - 컬럼마다 표본을 한 번만 뽑아 헤더 키워드와 값 패턴으로
+날짜 컬럼일 가능성을 점수화하고 순위를 매김 (행 수와 관계없이 일정한 비용)
+"""
+
+import logging
+
+import pandas as pd
+
+from date_extraction import PERIOD_COLUMN_KEYWORDS, sample_column_values
+
+logger = logging.getLogger('전학공앱')
+
+# 컬럼마다 살펴볼 표본 값 개수
+PROFILE_SAMPLE_SIZE = 100
+
+# 일반 날짜 관련 헤더 키워드
+DATE_HEADER_KEYWORDS = ['날짜', 'date', '일자', '연가', '휴가', '조퇴',
+                        '반차', '시작일', '종료일', '일정', '근무', '출장']
+
+# 날짜가 들어 있는 값 (2025.04.23, 2025-04-23, 2025/04/23, 2025년 4월 23일)
+DATE_VALUE_PATTERN = r'\d{4}[./-]\d{1,2}[./-]\d{1,2}|\d{4}년\s*\d{1,2}월\s*\d{1,2}일'
+# 기간 값 (2025.04.23 14:00 ~ 2025.04.23 16:40)
+PERIOD_VALUE_PATTERN = r'\d{4}[./-]\d{1,2}[./-]\d{1,2}.*~'
+
+# 점수 가중치 (값 패턴 + 헤더 키워드 + 기간 형식)
+CONTENT_WEIGHT = 0.6
+HEADER_WEIGHT = 0.3
+PERIOD_WEIGHT = 0.1
+
+# 이 점수 이상인 컬럼은 기본으로 선택
+DEFAULT_SELECTION_SCORE = 0.5
+
+
+def _header_score(col):
+    """헤더 키워드 점수: 기간 키워드 1.0, 일반 날짜 키워드 0.6, 없으면 0"""
+    col_lower = str(col).lower()
+    if any(keyword in col_lower for keyword in PERIOD_COLUMN_KEYWORDS):
+        return 1.0, '기간 키워드'
+    if any(keyword in col_lower for keyword in DATE_HEADER_KEYWORDS):
+        return 0.6, '날짜 키워드'
+    return 0.0, None
+
+
+def profile_column(values, col, sample_size=PROFILE_SAMPLE_SIZE):
+    """
+    컬럼 하나의 날짜 가능성 점수 계산
+
+    Returns:
+        dict (column, score, content_ratio, period_ratio, reasons, example)
+    """
+    header_score, header_reason = _header_score(col)
+    reasons = [header_reason] if header_reason else []
+    example = None
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        content_ratio, period_ratio = 1.0, 0.0
+        reasons.insert(0, '날짜/시간 타입')
+        sample = sample_column_values(values, 1)
+        if not sample.empty:
+            example = str(sample.iloc[0])
+    elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        # 숫자 컬럼은 순번 등과 구분할 수 없어 헤더 키워드로만 판단
+        content_ratio, period_ratio = 0.0, 0.0
+    else:
+        sample = sample_column_values(values, sample_size).astype(str)
+        if sample.empty:
+            content_ratio, period_ratio = 0.0, 0.0
+        else:
+            date_match = sample.str.contains(DATE_VALUE_PATTERN, regex=True)
+            period_match = sample.str.contains(PERIOD_VALUE_PATTERN, regex=True)
+            content_ratio = float(date_match.mean())
+            period_ratio = float(period_match.mean())
+            if content_ratio > 0:
+                reasons.insert(0, f'날짜 값 {content_ratio:.0%}')
+                example = sample[date_match].iloc[0]
+            if period_ratio > 0:
+                reasons.append('기간 형식')
+
+    score = CONTENT_WEIGHT * content_ratio + HEADER_WEIGHT * header_score + PERIOD_WEIGHT * period_ratio
+    return {
+        'column': col,
+        'score': round(score, 3),
+        'content_ratio': content_ratio,
+        'period_ratio': period_ratio,
+        'reasons': reasons,
+        'example': example,
+    }
+
+
+def profile_date_columns(df, sample_size=PROFILE_SAMPLE_SIZE):
+    """
+    데이터프레임의 모든 컬럼을 날짜 가능성 순으로 정렬
+
+    Args:
+        df: 데이터프레임
+        sample_size: 컬럼마다 살펴볼 표본 값 개수
+
+    Returns:
+        점수가 0보다 큰 컬럼의 profile_column 결과 목록 (점수 높은 순, 같으면 원래 컬럼 순서)
+    """
+    profiles = []
+    for col in df.columns:
+        try:
+            profile = profile_column(df[col], col, sample_size)
+        except Exception as e:
+            logger.error(f"컬럼 {col} 탐지 중 오류: {e}")
+            continue
+        if profile['score'] > 0:
+            profiles.append(profile)
+    profiles.sort(key=lambda profile: -profile['score'])
+    return profiles
+
+
+def default_date_columns(profiles, min_score=DEFAULT_SELECTION_SCORE):
+    """
+    기본으로 선택할 컬럼 목록 (기준 점수 이상인 컬럼, 없으면 1순위 컬럼)
+    """
+    selected = [profile['column'] for profile in profiles if profile['score'] >= min_score]
+    if not selected and profiles:
+        selected = [profiles[0]['column']]
+    return selected
@@ -0,0 +1,743 @@
+# -*- coding: utf-8 -*-
+"""
+날짜 추출 엔진 - 업로드된 근무상황/출장 목록에서 날짜를 뽑아냅니다.
+"""
+
+import os
+import re
+import logging
+import functools
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('전학공앱')
+# 값 단위 상세 추적 로그 - 기본은 꺼져 있고 DATE_EXTRACTION_TRACE=1 일 때만 기록
+# (메시지는 %s 인자로 넘겨 로그가 꺼져 있으면 문자열을 만들지 않음)
+trace_logger = logging.getLogger('전학공앱.날짜추출')
+if os.environ.get('DATE_EXTRACTION_TRACE', '').lower() in ('1', 'true', 'yes'):
+    trace_logger.setLevel(logging.DEBUG)
+
+# extract_date 결과 캐시 크기 (프로세스 전체에서 공유, 오래 안 쓴 값부터 제거)
+EXTRACT_DATE_CACHE_SIZE = 50000
+
+# 기간(시작 ~ 종료) 형식으로 취급하는 컬럼명 키워드
+PERIOD_COLUMN_KEYWORDS = ['출장기간', '기간', '휴가기간']
+
+
+def is_period_column_name(col):
+    """컬럼명으로 출장기간/기간 컬럼 여부 판단"""
+    col_lower = str(col).lower()
+    return any(keyword in col_lower for keyword in PERIOD_COLUMN_KEYWORDS)
+
+
+# 날짜 객체 정규화 함수
+def normalize_date(date_obj):
+    """
+    다양한 날짜 객체 타입을 datetime.date 타입으로 통일
+    """
+    if pd.isna(date_obj):
+        return None
+    
+    if isinstance(date_obj, datetime):
+        return date_obj.date()
+    elif isinstance(date_obj, pd.Timestamp):
+        return date_obj.date()
+    elif isinstance(date_obj, str):
+        try:
+            return pd.to_datetime(date_obj).date()
+        except:
+            return None
+    else:
+        return date_obj  # 이미 date 객체이거나 처리할 수 없는 경우
+
+# 날짜 처리 함수
+def extract_date(date_string, is_period_column=False):
+    """
+    다양한 형식의 날짜 문자열에서 날짜를 추출하는 함수
+    is_period_column: 출장기간/기간 컬럼 여부
+
+    같은 값은 반복해서 나오므로 (값, 기간 컬럼 여부) 단위로 결과를 캐시합니다.
+    캐시는 프로세스가 살아 있는 동안 유지되어 다음 업로드에서도 재사용됩니다.
+    """
+    return _extract_date_with_strategy(date_string, is_period_column)[0]
+
+
+def _extract_date_with_strategy(date_string, is_period_column=False):
+    """extract_date와 같지만 (날짜, 사용된 단계) 튜플을 반환"""
+    try:
+        return _extract_date_cached(date_string, bool(is_period_column))
+    except TypeError:
+        # 해시할 수 없는 값은 캐시 없이 처리
+        return _parse_date_value(date_string, is_period_column=is_period_column)
+
+
+def extract_date_cache_info():
+    """extract_date 캐시 상태 (hits, misses, maxsize, currsize)"""
+    return _extract_date_cached.cache_info()
+
+
+def _parse_date_value(date_string, is_period_column=False):
+    """
+    extract_date의 실제 변환 로직 (캐시 없음)
+    Returns: (날짜 또는 None, 사용된 단계 이름)
+    
+    지원하는 날짜 형식:
+    - YYYY-MM-DD, YYYY.MM.DD, YYYY/MM/DD
+    - MM/DD/YYYY, DD.MM.YYYY
+    - YYYY년 MM월 DD일
+    - 엑셀 숫자 형식 (시리얼 날짜)
+    - 기간 형식 (YYYY.MM.DD HH:MM ~ YYYY.MM.DD HH:MM)
+    - datetime, Timestamp 객체
+    """
+    # NaN 또는 빈 값 처리
+    if pd.isna(date_string) or date_string == "" or date_string is None:
+        return None, 'empty'
+        
+    # 문자열이 아닌 경우 처리
+    if not isinstance(date_string, str):
+        try:
+            # 숫자인 경우 엑셀 시리얼 날짜로 처리
+            if isinstance(date_string, (int, float)):
+                # 엑셀의 날짜 시리얼 번호 (1900년 1월 1일부터의 일수)
+                # 엑셀은 1900-01-01을 1로 시작 (단, 버그로 1900년을 윤년으로 처리)
+                if 1 <= date_string <= 2958465:  # 유효 범위 (1900-01-01 ~ 9999-12-31)
+                    # pandas의 엑셀 날짜 변환 사용
+                    excel_epoch = datetime(1899, 12, 30)  # 엑셀 epoch
+                    result_date = excel_epoch + timedelta(days=date_string)
+                    trace_logger.debug("엑셀 시리얼 날짜 변환 성공: %s -> %s", date_string, result_date.date())
+                    return result_date.date(), 'excel_serial'
+            
+            # datetime, Timestamp 등의 객체를 datetime.date로 변환
+            return normalize_date(date_string), 'object'
+        except Exception as e:
+            trace_logger.debug("숫자/객체 변환 실패: %s", e)
+            return None, 'error'
+    
+    # 문자열 앞뒤 공백 제거
+    date_string = date_string.strip()
+    
+    # 빈 문자열 체크
+    if not date_string:
+        return None, 'empty'
+    
+    try:
+        # 0. 상세 추적 (디버그 모드에서만 기록)
+        trace_logger.debug("날짜 추출 시도: '%s'", date_string)
+        
+        # 1-0. 특수 컬럼(출장기간/기간) 처리
+        if is_period_column:
+            # 2025.04.23 14:00 ~ 2025.04.23 16:40 패턴 처리
+            if ' ~ ' in date_string:
+                first_part = date_string.split(' ~ ')[0].strip()
+                trace_logger.debug("기간 컬럼 ~ 앞 부분: '%s'", first_part)
+                
+                # 공백이 있는 경우 처리 (날짜+시간)
+                if ' ' in first_part:
+                    date_part = first_part.split(' ')[0].strip()
+                    trace_logger.debug("기간 컬럼 날짜 부분: '%s'", date_part)
+                else:
+                    date_part = first_part
+                
+                # 2025.04.23 형식
+                if '.' in date_part:
+                    try:
+                        year, month, day = map(int, date_part.split('.'))
+                        trace_logger.debug("기간 컬럼 날짜 추출 성공: %s-%s-%s", year, month, day)
+                        return datetime(year, month, day).date(), 'period_column'
+                    except Exception as e:
+                        trace_logger.debug("기간 컬럼 날짜 추출 실패(점 구분자): %s", e)
+                
+                # 2025-04-23 형식
+                elif '-' in date_part:
+                    try:
+                        year, month, day = map(int, date_part.split('-'))
+                        trace_logger.debug("기간 컬럼 날짜 추출 성공: %s-%s-%s", year, month, day)
+                        return datetime(year, month, day).date(), 'period_column'
+                    except Exception as e:
+                        trace_logger.debug("기간 컬럼 날짜 추출 실패(하이픈 구분자): %s", e)
+        
+        # 1. "YYYY.MM.DD HH:MM ~ YYYY.MM.DD HH:MM" 형식 처리
+        if ' ~ ' in date_string:
+            # '~' 기호 앞의 부분만 추출
+            first_part = date_string.split(' ~ ')[0].strip()
+            trace_logger.debug("~ 기호 앞 부분: '%s'", first_part)
+            
+            # 날짜와 시간이 있는 경우, 날짜 부분만 추출
+            if ' ' in first_part:
+                date_part = first_part.split(' ')[0].strip()
+                trace_logger.debug("날짜 부분만 추출: '%s'", date_part)
+            else:
+                date_part = first_part
+            
+            # 점(.) 또는 하이픈(-) 구분자 있는지 확인
+            if '.' in date_part:
+                # 2025.04.23 형식
+                try:
+                    year, month, day = map(int, date_part.split('.'))
+                    trace_logger.debug("날짜 추출 성공 (형식1): %s-%s-%s", year, month, day)
+                    return datetime(year, month, day).date(), 'period'
+                except Exception as e:
+                    trace_logger.debug("날짜 추출 실패 (형식1): %s", e)
+                    pass  # 변환 실패 시 다음 단계로
+            elif '-' in date_part:
+                # 2025-04-23 형식
+                try:
+                    year, month, day = map(int, date_part.split('-'))
+                    trace_logger.debug("날짜 추출 성공 (형식2): %s-%s-%s", year, month, day)
+                    return datetime(year, month, day).date(), 'period'
+                except Exception as e:
+                    trace_logger.debug("날짜 추출 실패 (형식2): %s", e)
+                    pass  # 변환 실패 시 다음 단계로
+        
+        # 2. 단순 날짜 형식 (YYYY.MM.DD 또는 YYYY-MM-DD) 처리
+        if '.' in date_string and date_string.count('.') == 2:
+            # 2025.04.23 형식
+            try:
+                parts = date_string.split('.')
+                if len(parts) == 3 and len(parts[0]) == 4:  # 연도가 4자리인지 확인
+                    year, month, day = map(int, parts)
+                    trace_logger.debug("날짜 추출 성공 (형식3): %s-%s-%s", year, month, day)
+                    return datetime(year, month, day).date(), 'dotted'
+            except Exception as e:
+                trace_logger.debug("날짜 추출 실패 (형식3): %s", e)
+                pass  # 변환 실패 시 다음 단계로
+        
+        if '-' in date_string and date_string.count('-') == 2:
+            # 2025-04-23 형식
+            try:
+                parts = date_string.split('-')
+                if len(parts) == 3 and len(parts[0]) == 4:  # 연도가 4자리인지 확인
+                    year, month, day = map(int, parts)
+                    trace_logger.debug("날짜 추출 성공 (형식4): %s-%s-%s", year, month, day)
+                    return datetime(year, month, day).date(), 'dashed'
+            except Exception as e:
+                trace_logger.debug("날짜 추출 실패 (형식4): %s", e)
+                pass  # 변환 실패 시 다음 단계로
+        
+        # 3. 정규 표현식으로 날짜 부분 추출
+        date_pattern = r'\b(\d{4})[./-](\d{1,2})[./-](\d{1,2})\b'
+        match = re.search(date_pattern, date_string)
+        if match:
+            try:
+                year, month, day = map(int, match.groups())
+                trace_logger.debug("날짜 추출 성공 (정규식): %s-%s-%s", year, month, day)
+                return datetime(year, month, day).date(), 'regex'
+            except Exception as e:
+                trace_logger.debug("날짜 추출 실패 (정규식): %s", e)
+                pass  # 변환 실패 시 다음 단계로
+        
+        # 4. pandas의 자동 변환 시도
+        try:
+            date_obj = pd.to_datetime(date_string)
+            trace_logger.debug("날짜 추출 성공 (pandas): %s", date_obj.date())
+            return date_obj.date(), 'pandas'
+        except Exception as e:
+            trace_logger.debug("날짜 추출 실패 (pandas): %s", e)
+            pass  # 변환 실패 시 다음 단계로
+        
+        # 5. 한글 날짜 형식 처리 (예: "2025년 4월 23일")
+        korean_pattern = r'(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일'
+        match = re.search(korean_pattern, date_string)
+        if match:
+            try:
+                year, month, day = map(int, match.groups())
+                trace_logger.debug("날짜 추출 성공 (한글): %s-%s-%s", year, month, day)
+                return datetime(year, month, day).date(), 'korean'
+            except Exception as e:
+                trace_logger.debug("날짜 추출 실패 (한글): %s", e)
+                pass
+        
+        # 6. MM/DD/YYYY 형식 처리
+        if '/' in date_string and date_string.count('/') == 2:
+            try:
+                parts = date_string.split('/')
+                if len(parts) == 3:
+                    # MM/DD/YYYY 형식인지 DD/MM/YYYY 형식인지 판단
+                    if len(parts[2]) == 4:  # 세 번째가 연도 (MM/DD/YYYY)
+                        month, day, year = map(int, parts)
+                    elif len(parts[0]) == 4:  # 첫 번째가 연도 (YYYY/MM/DD)
+                        year, month, day = map(int, parts)
+                    else:
+                        # 불명확한 경우 MM/DD/YYYY로 가정
+                        month, day, year = map(int, parts)
+                    
+                    trace_logger.debug("날짜 추출 성공 (슬래시 구분): %s-%s-%s", year, month, day)
+                    return datetime(year, month, day).date(), 'slash'
+            except Exception as e:
+                trace_logger.debug("날짜 추출 실패 (슬래시 구분): %s", e)
+                pass
+        
+        # 7. 출장/휴가 특수 패턴 처리
+        vacation_pattern = r'(\d{4})-(\d{1,2})-(\d{1,2}) \d{1,2}:\d{1,2} ~ \d{4}-\d{1,2}-\d{1,2}'
+        if re.search(vacation_pattern, date_string):
+            try:
+                parts = date_string.split(' ')[0].split('-')
+                year, month, day = map(int, parts)
+                trace_logger.debug("날짜 추출 성공 (휴가 특수패턴): %s-%s-%s", year, month, day)
+                return datetime(year, month, day).date(), 'vacation_pattern'
+            except Exception as e:
+                trace_logger.debug("날짜 추출 실패 (휴가 특수패턴): %s", e)
+                pass
+        
+        # 모든 변환 시도 실패
+        trace_logger.debug("모든 방법으로 날짜 추출 실패: '%s'", date_string)
+        return None, 'failed'
+            
+    except Exception as e:
+        # 변환 실패
+        trace_logger.debug("날짜 추출 중 예외 발생: %s, 원본: '%s'", e, date_string)
+        return None, 'error'
+
+
+@functools.lru_cache(maxsize=EXTRACT_DATE_CACHE_SIZE, typed=True)
+def _extract_date_cached(date_string, is_period_column):
+    return _parse_date_value(date_string, is_period_column=is_period_column)
+
+
+# ---------------------------------------------------------------------------
+# 컬럼 단위(벡터화) 날짜 추출
+#
+# 컬럼마다 표본으로 날짜 형식을 한 번 판별한 뒤, 그 형식의 정규식 하나로
+# 컬럼 전체를 한 번에 변환합니다. 패턴에 맞지 않거나 존재하지 않는 날짜인
+# 값만 extract_date(전체 단계)로 넘기므로 결과는 행별 처리와 같습니다.
+# ---------------------------------------------------------------------------
+
+# 형식 판별에 사용할 표본 크기
+FORMAT_SNIFF_SAMPLE_SIZE = 50
+
+# 문자열 날짜 형식: 키 -> (표시 이름, 패턴)
+# 패턴 전체에 맞고 실제 존재하는 날짜인 값은 extract_date와 결과가 같은 경우만 포함
+STRING_DATE_FORMATS = {
+    'period': (
+        '기간 (YYYY.MM.DD HH:MM ~ ...)',
+        re.compile(r'^(?P<year>[0-9]+)(?P<sep>[.-])(?P<month>[0-9]+)(?P=sep)(?P<day>[0-9]+)(?: .*)? ~ ')
+    ),
+    'period_slash': (
+        '기간 (YYYY/MM/DD HH:MM ~ ...)',
+        re.compile(r'^(?P<year>[0-9]{4})/(?P<month>[0-9]{1,2})/(?P<day>[0-9]{1,2})(?: .*)? ~ ')
+    ),
+    'date': (
+        '날짜 (YYYY.MM.DD / YYYY-MM-DD)',
+        re.compile(r'^(?P<year>[0-9]{4})(?P<sep>[.-])(?P<month>[0-9]+)(?P=sep)(?P<day>[0-9]+)$')
+    ),
+    'date_time': (
+        '날짜+시각 (YYYY.MM.DD HH:MM)',
+        re.compile(r'^(?P<year>[0-9]{4})(?P<sep>[./-])(?P<month>[0-9]{1,2})(?P=sep)(?P<day>[0-9]{1,2}) [0-9]{1,2}:[0-9]{2}(?::[0-9]{2})?$')
+    ),
+    'slash': (
+        '날짜 (YYYY/MM/DD)',
+        re.compile(r'^(?P<year>[0-9]{4})/(?P<month>[0-9]{1,2})/(?P<day>[0-9]{1,2})$')
+    ),
+    'korean': (
+        '한글 날짜 (YYYY년 M월 D일)',
+        re.compile(r'^(?P<year>[0-9]{4})년\s*(?P<month>[0-9]{1,2})월\s*(?P<day>[0-9]{1,2})일$')
+    ),
+}
+
+# 문자열이 아닌 형식의 표시 이름
+OTHER_DATE_FORMAT_LABELS = {
+    'datetime': '날짜/시간 값',
+    'excel_serial': '엑셀 날짜 숫자',
+    None: '판별 불가 (전체 단계 처리)',
+}
+
+# 기간 값의 '~' 뒤 종료 날짜
+_PERIOD_END_RE = re.compile(r'^(?P<year>[0-9]{4})[./-](?P<month>[0-9]{1,2})[./-](?P<day>[0-9]{1,2})(?![0-9])')
+
+# 엑셀 시리얼 날짜
+_EXCEL_EPOCH = np.datetime64('1899-12-30', 'D')
+_EXCEL_SERIAL_MAX = 2958465
+_NAT_DAY = np.datetime64('NaT', 'D')
+
+
+def date_format_label(format_key):
+    """날짜 형식 키의 표시 이름"""
+    if format_key in STRING_DATE_FORMATS:
+        return STRING_DATE_FORMATS[format_key][0]
+    return OTHER_DATE_FORMAT_LABELS.get(format_key, str(format_key))
+
+
+def _ymd_to_days(year, month, day):
+    """
+    연/월/일 숫자 배열을 datetime64[D] 배열로 변환
+    존재하지 않는 날짜(2월 30일 등)나 범위를 벗어난 값은 NaT
+    """
+    year = pd.to_numeric(year, errors='coerce').to_numpy(dtype='float64')
+    month = pd.to_numeric(month, errors='coerce').to_numpy(dtype='float64')
+    day = pd.to_numeric(day, errors='coerce').to_numpy(dtype='float64')
+
+    result = np.full(len(year), _NAT_DAY)
+    valid = (
+        (year >= 1) & (year <= 9999) &
+        (month >= 1) & (month <= 12) &
+        (day >= 1) & (day <= 31)
+    )
+    if not valid.any():
+        return result
+
+    y = year[valid].astype('int64')
+    m = month[valid].astype('int64')
+    d = day[valid].astype('int64')
+    months = ((y - 1970) * 12 + (m - 1)).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + (d - 1).astype('timedelta64[D]')
+    # 말일을 넘긴 날짜는 다음 달로 넘어가므로 제외
+    in_month = days.astype('datetime64[M]') == months
+    days[~in_month] = _NAT_DAY
+    result[valid] = days
+    return result
+
+
+def _vectorized_excel_serials(numbers):
+    """
+    엑셀 시리얼 숫자 배열을 datetime64[D]로 변환 (origin 1899-12-30)
+
+    Returns:
+        (days, resolved): 범위를 벗어난 값이나 자정 경계에 걸친 소수는 미확정
+    """
+    values = numbers.astype('float64')
+    days = np.full(len(values), _NAT_DAY)
+    whole = np.floor(values)
+    # timedelta의 마이크로초 반올림으로 다음 날이 될 수 있는 값은 제외
+    resolved = (
+        (values >= 1) & (values <= _EXCEL_SERIAL_MAX) &
+        (values - whole <= 1 - 1e-9)
+    )
+    days[resolved] = _EXCEL_EPOCH + whole[resolved].astype('int64').astype('timedelta64[D]')
+    return days, resolved
+
+
+def extract_period_end_dates(values):
+    """
+    '시작 ~ 종료' 형식 값에서 종료 날짜를 추출
+
+    Returns:
+        datetime64[D] 배열 (기간 형식이 아니거나 종료 날짜를 읽을 수 없으면 NaT)
+    """
+    days = np.full(len(values), _NAT_DAY)
+    if len(values) == 0:
+        return days
+    str_mask = (values.map(type) == str).to_numpy()
+    if not str_mask.any():
+        return days
+    strings = values[str_mask].astype(str)
+    has_tilde = strings.str.contains(' ~ ', regex=False).to_numpy()
+    if not has_tilde.any():
+        return days
+    end_part = strings[has_tilde].str.split(' ~ ', n=1).str[1].str.strip()
+    parts = end_part.str.extract(_PERIOD_END_RE)
+    idx = np.flatnonzero(str_mask)[has_tilde]
+    days[idx] = _ymd_to_days(parts['year'], parts['month'], parts['day'])
+    return days
+
+
+def to_day_array(values):
+    """date/datetime 값 목록을 datetime64[D] 배열로 변환 (날짜가 아닌 값은 NaT)"""
+    values = pd.Series(values, dtype=object)
+    is_date = values.map(lambda v: isinstance(v, (date, datetime, pd.Timestamp))).to_numpy(dtype=bool)
+    days = np.full(len(values), _NAT_DAY)
+    if is_date.any():
+        days[is_date] = pd.to_datetime(values[is_date]).to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    return days
+
+
+def expand_intervals(starts, ends=None):
+    """
+    (시작, 종료) 날짜 구간들을 포함하는 모든 날짜로 전개
+
+    겹치거나 맞닿은 구간을 먼저 병합한 뒤 한 번에 전개하므로
+    행이 많거나 기간이 길어도 결과 크기는 실제로 덮인 날짜 수를 넘지 않습니다.
+
+    Args:
+        starts: 시작 날짜 배열 (datetime64[D] 변환 가능, NaT는 무시)
+        ends: 종료 날짜 배열 (없거나 NaT이거나 시작보다 이르면 시작일 하루)
+
+    Returns:
+        정렬된 고유 datetime64[D] 배열
+    """
+    starts = np.asarray(starts, dtype='datetime64[D]')
+    if ends is None:
+        ends = starts
+    ends = np.asarray(ends, dtype='datetime64[D]')
+    ends = np.where(np.isnat(ends) | (ends < starts), starts, ends)
+
+    valid = ~np.isnat(starts)
+    if not valid.any():
+        return np.array([], dtype='datetime64[D]')
+
+    start_days = starts[valid].astype('int64')
+    end_days = ends[valid].astype('int64')
+    order = np.argsort(start_days, kind='stable')
+    start_days = start_days[order]
+    end_days = end_days[order]
+
+    # 앞 구간들의 최대 종료일 다음 날보다 늦게 시작하면 새 구간
+    running_end = np.maximum.accumulate(end_days)
+    new_group = np.empty(len(start_days), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = start_days[1:] > running_end[:-1] + 1
+    group_starts = np.flatnonzero(new_group)
+    merged_start = start_days[group_starts]
+    merged_end = np.maximum.reduceat(end_days, group_starts)
+
+    lengths = merged_end - merged_start + 1
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    days = np.repeat(merged_start, lengths) + offsets
+    return days.astype('datetime64[D]')
+
+
+def sample_column_values(values, sample_size):
+    """컬럼 전체를 훑지 않고 고르게 표본 추출 (결측값 제외)"""
+    n = len(values)
+    if n <= sample_size:
+        return values.dropna()
+    positions = np.unique(np.linspace(0, n - 1, sample_size).astype('int64'))
+    sample = values.iloc[positions].dropna()
+    if sample.empty:
+        # 값이 드문 컬럼은 앞쪽 값으로 대신함
+        sample = values.dropna().head(sample_size)
+    return sample
+
+
+def sniff_column_format(values, sample_size=FORMAT_SNIFF_SAMPLE_SIZE):
+    """
+    표본 값으로 컬럼의 날짜 형식을 판별
+
+    Returns:
+        STRING_DATE_FORMATS의 키, 'datetime', 'excel_serial' 또는 None (판별 불가)
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'datetime'
+    if pd.api.types.is_bool_dtype(values):
+        return None
+    if pd.api.types.is_numeric_dtype(values):
+        return 'excel_serial'
+
+    sample = sample_column_values(values, sample_size)
+    if sample.empty:
+        return None
+
+    sample_types = sample.map(type)
+    strings = sample[sample_types == str].astype(str).str.strip()
+    number_count = int(sample_types.isin([int, float]).sum())
+
+    best_format, best_count = None, 0
+    for format_key, (_, pattern) in STRING_DATE_FORMATS.items():
+        count = int(strings.str.match(pattern).sum()) if len(strings) else 0
+        if count > best_count:
+            best_format, best_count = format_key, count
+    if number_count > best_count:
+        best_format = 'excel_serial'
+    return best_format
+
+
+def extract_column_dates(values, is_period_column=False, column_format=None):
+    """
+    컬럼 전체를 한 번에 날짜로 변환
+
+    column_format이 없으면 표본으로 형식을 판별하고, 그 형식의 패턴 하나로
+    컬럼 전체를 변환합니다. 패턴으로 처리하지 못한 값만 extract_date로 넘깁니다.
+
+    Returns:
+        (result, strategies, info)
+        result: 입력과 같은 인덱스의 object Series (datetime.date 또는 None)
+        strategies: 값마다 사용된 단계 ('pattern:<형식>' 또는 'cascade:<단계>')
+        info: {'format', 'label', 'parsed', 'fallback'} 형식 판별/처리 통계
+    """
+    n = len(values)
+    result = pd.Series([None] * n, index=values.index, dtype=object)
+    strategies = np.full(n, 'empty', dtype=object)
+    if column_format is None:
+        column_format = sniff_column_format(values)
+    info = {
+        'format': column_format,
+        'label': date_format_label(column_format),
+        'parsed': 0,
+        'fallback': 0,
+    }
+    if n == 0:
+        return result, pd.Series(strategies, index=values.index, dtype=object), info
+
+    present = values.notna().to_numpy()
+    days = np.full(n, _NAT_DAY)
+    resolved = ~present
+
+    if column_format == 'datetime' and pd.api.types.is_datetime64_any_dtype(values):
+        stamps = values
+        if getattr(stamps.dt, 'tz', None) is not None:
+            stamps = stamps.dt.tz_localize(None)
+        days = stamps.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+        resolved = np.ones(n, dtype=bool)
+
+    elif column_format == 'excel_serial':
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            num_mask = present
+        else:
+            num_mask = values.map(type).isin([int, float]).to_numpy() & present
+        if num_mask.any():
+            num_days, num_resolved = _vectorized_excel_serials(values[num_mask].to_numpy(dtype='float64'))
+            idx = np.flatnonzero(num_mask)
+            days[idx] = num_days
+            resolved[idx] = num_resolved
+
+    elif column_format in STRING_DATE_FORMATS or column_format is None:
+        str_mask = (values.map(type) == str).to_numpy() & present
+        if str_mask.any():
+            strings = values[str_mask].astype(str).str.strip()
+            idx = np.flatnonzero(str_mask)
+            # 공백뿐인 값은 extract_date에서도 None
+            blank = (strings == '').to_numpy()
+            resolved[idx[blank]] = True
+            if column_format is not None:
+                _, pattern = STRING_DATE_FORMATS[column_format]
+                parts = strings.str.extract(pattern)
+                str_days = _ymd_to_days(parts['year'], parts['month'], parts['day'])
+                ok = ~np.isnat(str_days)
+                days[idx[ok]] = str_days[ok]
+                resolved[idx[ok]] = True
+
+    found = ~np.isnat(days) & present
+    result[found] = days[found].astype(object)
+    strategies[found] = f'pattern:{column_format}'
+    info['parsed'] = int((resolved & present).sum())
+
+    # 형식 패턴으로 처리하지 못한 값은 기존 extract_date로 처리
+    fallback = ~resolved
+    if fallback.any():
+        fallback_results = [
+            _extract_date_with_strategy(value, is_period_column=is_period_column)
+            for value in values[fallback].tolist()
+        ]
+        result[fallback] = [date_value for date_value, _ in fallback_results]
+        strategies[fallback] = [f'cascade:{strategy}' for _, strategy in fallback_results]
+        info['fallback'] = int(fallback.sum())
+
+    return result, pd.Series(strategies, index=values.index, dtype=object), info
+
+
+def extract_dates(df, date_columns, progress_callback=None):
+    """
+    여러 날짜 컬럼에서 행마다 처음으로 변환에 성공한 날짜를 추출
+
+    Args:
+        df: 원본 데이터프레임
+        date_columns: 시도할 컬럼 목록 (앞쪽 컬럼 우선)
+        progress_callback: 컬럼 하나를 처리할 때마다 (처리한 값 수, 전체 값 수)를 받는 함수
+
+    Returns:
+        (result_df, attempts, column_formats)
+        result_df: '추출된_날짜', '추출된_종료_날짜', '사용된_컬럼' 컬럼을 가진 데이터프레임 (df와 같은 인덱스)
+                   '추출된_종료_날짜'는 기간 값일 때의 종료일 (단일 날짜면 None)
+        attempts: 시도 기록 (행, 컬럼, 값, 단계, 추출된 날짜) 데이터프레임
+        column_formats: 컬럼별 감지 형식과 처리 통계 목록
+    """
+    extracted = pd.Series([None] * len(df), index=df.index, dtype=object)
+    extracted_end = pd.Series([None] * len(df), index=df.index, dtype=object)
+    used_column = pd.Series([None] * len(df), index=df.index, dtype=object)
+    pending = np.ones(len(df), dtype=bool)
+    attempts = []
+    column_formats = []
+
+    for col_no, col in enumerate(date_columns):
+        # 형식은 컬럼 전체 표본으로 한 번만 판별
+        column_format = sniff_column_format(df[col])
+        if pending.any():
+            column_values = df[col][pending]
+            # 비어 있는 값은 시도하지 않음
+            tried = column_values.notna().to_numpy()
+            if not pd.api.types.is_datetime64_any_dtype(column_values):
+                tried = tried & (column_values != "").to_numpy()
+            column_values = column_values[tried]
+
+            dates, strategies, info = extract_column_dates(
+                column_values,
+                is_period_column=is_period_column_name(col),
+                column_format=column_format
+            )
+            ok = dates.notna().to_numpy()
+
+            attempts.append(pd.DataFrame({
+                '행': column_values.index,
+                '컬럼': col,
+                '값': column_values.to_numpy(dtype=object),
+                '단계': strategies.to_numpy(dtype=object),
+                '추출된_날짜': dates.to_numpy(dtype=object),
+            }))
+
+            hit_index = column_values.index[ok]
+            extracted[hit_index] = dates[ok]
+            extracted_end[hit_index] = extract_period_end_dates(column_values[ok]).astype(object)
+            used_column[hit_index] = col
+            pending[df.index.get_indexer(hit_index)] = False
+        else:
+            info = {'format': column_format, 'label': date_format_label(column_format), 'parsed': 0, 'fallback': 0}
+
+        column_formats.append({'column': col, **info})
+
+        if progress_callback is not None:
+            progress_callback((col_no + 1) * len(df), len(date_columns) * len(df))
+
+    if attempts:
+        attempts = pd.concat(attempts).sort_values('행', kind='stable').reset_index(drop=True)
+    else:
+        attempts = pd.DataFrame(columns=['행', '컬럼', '값', '단계', '추출된_날짜'])
+
+    result_df = pd.DataFrame({
+        '추출된_날짜': extracted,
+        '추출된_종료_날짜': extracted_end,
+        '사용된_컬럼': used_column
+    })
+    return result_df, attempts, column_formats
+
+
+def summarize_extraction(attempts):
+    """시도 기록을 (컬럼, 단계, 성공 여부)별 건수로 집계"""
+    if attempts.empty:
+        return pd.DataFrame(columns=['컬럼', '단계', '성공', '건수'])
+    summary = attempts.assign(성공=attempts['추출된_날짜'].notna())
+    return (
+        summary.groupby(['컬럼', '단계', '성공'], sort=False)
+        .size()
+        .reset_index(name='건수')
+    )
+
+
+def log_extraction_summary(attempts, column_formats):
+    """
+    변환 한 번에 대한 요약을 로그 한 줄로 기록
+
+    값마다 로그를 남기면 행 수만큼 문자열 생성과 출력 비용이 들기 때문에
+    컬럼/단계/성공 여부별 건수만 모아 남깁니다.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    summary = summarize_extraction(attempts)
+    success = int(summary.loc[summary['성공'], '건수'].sum())
+    failure = int(summary.loc[~summary['성공'], '건수'].sum())
+    formats = ', '.join(
+        f"{info['column']}={info['format']}(전체 단계 {info['fallback']}건)"
+        for info in column_formats
+    )
+    counts = ', '.join(
+        f"{row.컬럼}/{row.단계}/{'성공' if row.성공 else '실패'}={row.건수}"
+        for row in summary.itertuples(index=False)
+    )
+    logger.info("날짜 추출 요약: 성공 %d건, 실패 %d건 | 형식: %s | 단계별: %s", success, failure, formats, counts)
+
+
+def build_trace_table(attempts):
+    """
+    시도 기록을 화면에 표시할 변환 추적 표로 변환
+    (행, 컬럼, 원본 값, 값 타입, 처리 단계, 결과) - 반복되는 값은 범주형으로 저장
+    """
+    extracted = attempts['추출된_날짜']
+    return pd.DataFrame({
+        '행': attempts['행'].astype('int64'),
+        '컬럼': attempts['컬럼'].astype(str).astype('category'),
+        '원본_값': attempts['값'].astype(str),
+        '값_타입': attempts['값'].map(lambda v: type(v).__name__).astype('category'),
+        '단계': attempts['단계'].astype(str).astype('category'),
+        '성공': extracted.notna().astype(bool),
+        '결과': extracted.map(lambda d: '' if d is None else str(d)),
+    })
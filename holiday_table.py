@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+공휴일 표 - 연도별 대한민국 공휴일을 한 번만 계산해 프로세스 메모리와 디스크에 보관
+(음력 공휴일 계산이 느리므로 화면을 다시 그릴 때마다 workalendar를 호출하지 않음)
+"""
+
+import os
+import json
+import logging
+import tempfile
+import threading
+from datetime import date, datetime
+
+logger = logging.getLogger('전학공앱')
+
+# 공휴일 표 저장 위치
+HOLIDAY_TABLE_PATH = os.environ.get('HOLIDAY_TABLE_PATH', os.path.join('cache', 'holidays.json'))
+
+# 서버 시작 시 미리 계산할 연도 범위 ('2024-2030' 형식, 없으면 작년부터 2년 뒤까지)
+HOLIDAY_PRECOMPUTE_YEARS = os.environ.get('HOLIDAY_PRECOMPUTE_YEARS', '')
+
+_holidays = {}
+_loaded = False
+_lock = threading.Lock()
+
+
+def _load_table():
+    """디스크의 공휴일 표를 메모리로 읽기 (프로세스당 한 번)"""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    if not os.path.exists(HOLIDAY_TABLE_PATH):
+        return
+    try:
+        with open(HOLIDAY_TABLE_PATH, encoding='utf-8') as f:
+            table = json.load(f)
+        for year, holidays in table.items():
+            _holidays[int(year)] = tuple(
+                (date.fromisoformat(holiday_date), name) for holiday_date, name in holidays
+            )
+        logger.info("공휴일 표 로드: %s (%d개 연도)", HOLIDAY_TABLE_PATH, len(_holidays))
+    except Exception as e:
+        logger.error(f"공휴일 표 로드 오류: {e}")
+
+
+def _save_table():
+    """메모리의 공휴일 표를 디스크에 저장 (임시 파일에 쓴 뒤 교체)"""
+    table = {
+        str(year): [[holiday_date.isoformat(), name] for holiday_date, name in holidays]
+        for year, holidays in sorted(_holidays.items())
+    }
+    try:
+        folder = os.path.dirname(HOLIDAY_TABLE_PATH) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(table, f, ensure_ascii=False)
+        os.replace(temp_path, HOLIDAY_TABLE_PATH)
+    except Exception as e:
+        logger.error(f"공휴일 표 저장 오류: {e}")
+
+
+def _compute_holidays(years):
+    """workalendar로 공휴일 계산"""
+    from workalendar.asia import SouthKorea
+
+    cal = SouthKorea()
+    return {year: tuple(sorted(cal.holidays(year))) for year in years}
+
+
+def _ensure_years(years):
+    """표에 없는 연도만 계산해 추가하고 저장"""
+    with _lock:
+        _load_table()
+        missing = [year for year in years if year not in _holidays]
+        if missing:
+            _holidays.update(_compute_holidays(missing))
+            logger.info("공휴일 계산: %s년", ', '.join(str(year) for year in missing))
+            _save_table()
+
+
+def get_holidays(year):
+    """
+    해당 연도의 공휴일 목록
+
+    Returns:
+        (date, 공휴일 이름) 튜플의 튜플 (날짜순)
+    """
+    if year not in _holidays:
+        _ensure_years([year])
+    return _holidays[year]
+
+
+def precompute_year_range(today=None):
+    """HOLIDAY_PRECOMPUTE_YEARS 설정에 따른 미리 계산할 연도 범위"""
+    if HOLIDAY_PRECOMPUTE_YEARS:
+        try:
+            start, _, end = HOLIDAY_PRECOMPUTE_YEARS.partition('-')
+            return range(int(start), int(end or start) + 1)
+        except ValueError:
+            logger.warning("HOLIDAY_PRECOMPUTE_YEARS 형식 오류: %s", HOLIDAY_PRECOMPUTE_YEARS)
+    year = (today or datetime.now()).year
+    return range(year - 1, year + 3)
+
+
+def precompute_holidays(years=None):
+    """
+    서버 시작 시 여러 연도의 공휴일을 미리 계산 (이미 있는 연도는 건너뜀)
+    """
+    _ensure_years(list(years if years is not None else precompute_year_range()))
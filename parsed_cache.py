@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+읽은 파일 캐시 - 엑셀 파일을 읽은 데이터프레임을 파일 내용의 SHA-256 해시를 키로
+Arrow IPC 형식으로 디스크에 저장하고, 같은 파일은 메모리 매핑으로 바로 읽음
+(pyarrow가 없으면 캐시 없이 매번 파일을 읽음)
+
+읽는 방식(엔진, 컬럼 선택 기준 등)을 나타내는 문자열을 함께 기록해 두고, 다르면 다시 읽음
+"""
+
+import os
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger('전학공앱')
+
+try:
+    import pyarrow as pa
+    parsed_cache_available = True
+except ImportError:
+    pa = None
+    parsed_cache_available = False
+
+# 캐시 저장 위치와 최대 크기
+PARSED_CACHE_DIR = os.environ.get('PARSED_CACHE_DIR', os.path.join('cache', 'parsed'))
+PARSED_CACHE_MAX_BYTES = int(os.environ.get('PARSED_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+_lock = threading.Lock()
+
+
+def file_digests(path, chunk_size=1024 * 1024):
+    """
+    파일의 SHA-256(16진수)과 MD5(Storage와 같은 base64) 해시를 한 번 읽어서 계산
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+            md5.update(chunk)
+    return sha256.hexdigest(), base64.b64encode(md5.digest()).decode('ascii')
+
+
+def _entry_paths(sha256):
+    return (os.path.join(PARSED_CACHE_DIR, f"{sha256}.arrow"),
+            os.path.join(PARSED_CACHE_DIR, f"{sha256}.json"))
+
+
+def load_parsed(sha256, md5=None, reader_key=''):
+    """
+    캐시된 데이터프레임 읽기
+
+    Args:
+        sha256: 파일 내용의 SHA-256 해시
+        md5: 원본(Storage blob)의 MD5 해시 - 주어지면 캐시에 기록된 값과 같을 때만 사용
+        reader_key: 읽는 방식을 나타내는 문자열 - 캐시에 기록된 값과 다르면 사용하지 않음
+
+    Returns:
+        데이터프레임 또는 None (캐시 없음/불일치/읽기 오류)
+    """
+    if not parsed_cache_available:
+        return None
+    data_path, meta_path = _entry_paths(sha256)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if md5 and meta.get('md5') != md5:
+            logger.warning("읽은 파일 캐시 해시 불일치로 폐기: %s", sha256[:12])
+            _remove_entry(sha256)
+            return None
+        if meta.get('reader', '') != reader_key:
+            logger.info("읽는 방식이 바뀌어 읽은 파일 캐시 폐기: %s", sha256[:12])
+            _remove_entry(sha256)
+            return None
+        with pa.memory_map(data_path, 'r') as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+        # LRU 순서를 위해 사용 시각 갱신
+        os.utime(meta_path)
+        return df
+    except Exception as e:
+        logger.error(f"읽은 파일 캐시 로드 오류: {e}")
+        _remove_entry(sha256)
+        return None
+
+
+def store_parsed(sha256, md5, df, reader_key=''):
+    """
+    데이터프레임을 캐시에 저장 (Arrow로 변환할 수 없는 컬럼이 있으면 저장하지 않음)
+
+    Args:
+        reader_key: 읽는 방식을 나타내는 문자열 (load_parsed에서 비교)
+    """
+    if not parsed_cache_available:
+        return False
+    data_path, meta_path = _entry_paths(sha256)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        os.makedirs(PARSED_CACHE_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=PARSED_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            # 메모리 매핑으로 읽을 수 있도록 압축하지 않음
+            with pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, data_path)
+        # 메타데이터도 임시 파일에 쓴 뒤 바꿔 넣음 (동시에 읽는 스레드가 쓰다 만 파일을 보지 않도록)
+        fd, temp_path = tempfile.mkstemp(dir=PARSED_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'md5': md5, 'reader': reader_key, 'rows': len(df),
+                       'bytes': os.path.getsize(data_path)}, f)
+        os.replace(temp_path, meta_path)
+    except Exception as e:
+        logger.warning(f"읽은 파일 캐시 저장 건너뜀: {e}")
+        return False
+    evict_parsed_cache()
+    return True
+
+
+def _remove_entry(sha256):
+    for path in _entry_paths(sha256):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def evict_parsed_cache(max_bytes=None):
+    """
+    캐시 전체 크기가 최대 크기를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+    """
+    max_bytes = PARSED_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        if not os.path.isdir(PARSED_CACHE_DIR):
+            return
+        entries = []
+        for name in os.listdir(PARSED_CACHE_DIR):
+            if not name.endswith('.arrow'):
+                continue
+            sha256 = name[:-len('.arrow')]
+            data_path, meta_path = _entry_paths(sha256)
+            try:
+                used = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0
+                entries.append((used, os.path.getsize(data_path), sha256))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, sha256 in sorted(entries):
+            if total <= max_bytes:
+                break
+            _remove_entry(sha256)
+            total -= size
+            logger.info("읽은 파일 캐시 삭제 (용량 초과): %s", sha256[:12])
+
+
+def read_with_cache(path, reader, expected_md5=None, reader_key=''):
+    """
+    파일을 캐시를 거쳐 읽기
+
+    Args:
+        path: 로컬 파일 경로
+        reader: 캐시가 없을 때 파일을 읽는 함수 (path -> 데이터프레임)
+        expected_md5: Storage blob에 기록된 MD5 (base64) - 다운로드한 파일과 다르면 캐시하지 않음
+        reader_key: reader의 읽는 방식을 나타내는 문자열 (예: spreadsheet_reader.reader_signature())
+
+    Returns:
+        데이터프레임
+    """
+    if not parsed_cache_available:
+        return reader(path)
+    sha256, md5 = file_digests(path)
+    if expected_md5 and md5 != expected_md5:
+        # 다운로드가 손상되었거나 도중에 파일이 바뀜 - 캐시를 쓰지도 만들지도 않음
+        logger.warning("다운로드한 파일의 해시가 저장소와 다릅니다: %s", os.path.basename(path))
+        return reader(path)
+    df = load_parsed(sha256, md5, reader_key)
+    if df is None:
+        df = reader(path)
+        store_parsed(sha256, md5, df, reader_key)
+    return df
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+접속 상태(presence) 관리 - 실행(rerun)마다 쓰지 않고 마지막으로 쓴 지 일정 시간이 지났을 때만
+last_seen을 기록하고, 쓸 때 활성 인원 수를 함께 계산해 저장 (읽는 쪽은 참여자 목록을 훑지 않음)
+
+Streamlit에는 세션 종료 콜백이 없으므로, 프로세스의 세션 목록을 기억해 두었다가 런타임에서
+사라진 세션을 주기적으로 찾아 오프라인으로 기록 (RTDB onDisconnect 대신)
+"""
+
+import os
+import time
+import logging
+import threading
+
+from rtdb_cache import cached_get, cached_transaction, cached_update
+
+logger = logging.getLogger('전학공앱')
+
+# last_seen을 다시 쓰는 최소 간격(초)
+PRESENCE_HEARTBEAT_SECONDS = int(os.environ.get('PRESENCE_HEARTBEAT_SECONDS', 60))
+# 마지막 활동이 이 시간(초) 이내인 사용자만 활성으로 봄
+PRESENCE_ACTIVE_WINDOW = 180
+# 끝난 세션을 찾는 간격(초)
+PRESENCE_SWEEP_SECONDS = 30
+
+# {Streamlit 세션 ID: (그룹 경로, 멤버 키, 사용자 ID)}
+_sessions = {}
+_last_sweep = 0.0
+_lock = threading.Lock()
+
+
+def count_active(members, now=None, window=PRESENCE_ACTIVE_WINDOW):
+    """마지막 활동이 window초 이내이고 오프라인이 아닌 사용자 수"""
+    now = time.time() if now is None else now
+    if not isinstance(members, dict):
+        return 0
+    return sum(
+        1 for member in members.values()
+        if isinstance(member, dict)
+        and member.get("status") != "offline"
+        and member.get("last_seen", 0) > now - window
+    )
+
+
+def write_presence(db, group_path, members_key, user_id, status, now=None, create_group=False):
+    """
+    사용자 상태와 그룹의 활성 인원 수 기록
+
+    방이 삭제된 뒤에 쓰면 참여자/인원 수만 있는 빈 방이 다시 생기므로, 그룹이 없으면 쓰지 않음
+    (오프라인 기록은 그룹 노드에 대한 트랜잭션으로 그룹과 사용자 항목이 있을 때만 바꿈)
+
+    Args:
+        group_path: 방(rooms/{학교}/{방}) 또는 세션(sessions/{세션}) 경로
+        members_key: 그룹 아래 사용자 목록 키 ('participants' 또는 'users')
+        user_id: 사용자 ID
+        status: 'online' 또는 'offline'
+        create_group: 그룹이 없을 때 새로 만들어도 되는지 (작업 세션처럼 첫 기록이 그룹을 만드는 경우)
+
+    Returns:
+        실제로 기록했으면 True
+    """
+    now = int(time.time() if now is None else now)
+
+    if status == "offline":
+        def mark_offline(group):
+            members = group.get(members_key) if isinstance(group, dict) else None
+            if not isinstance(members, dict) or not isinstance(members.get(user_id), dict):
+                # 그룹이나 사용자 항목이 없으면 그대로 둠 (None이면 아무것도 만들지 않음)
+                return group
+            members[user_id] = {**members[user_id], "last_seen": now, "status": "offline"}
+            group["active_count"] = {"count": count_active(members, now), "computed_at": now}
+            return group
+
+        result = cached_transaction(db, group_path, mark_offline)
+        return isinstance(result, dict)
+
+    # 다른 사용자 정보는 캐시된 값으로 충분 (자기 항목만 새 값으로 바꿔 계산)
+    group = cached_get(db, group_path)
+    if not isinstance(group, dict):
+        if not create_group:
+            return False
+        group = {}
+    members = group.get(members_key)
+    if not isinstance(members, dict):
+        members = {}
+    members[user_id] = {**(members.get(user_id) or {}), "last_seen": now, "status": status}
+    cached_update(db, group_path, {
+        f"{members_key}/{user_id}/last_seen": now,
+        f"{members_key}/{user_id}/status": status,
+        "active_count": {"count": count_active(members, now), "computed_at": now},
+    })
+    return True
+
+
+def heartbeat(db, state, group_path, members_key, user_id, status="online", session_id=None,
+              create_group=False, now=None):
+    """
+    마지막으로 쓴 지 PRESENCE_HEARTBEAT_SECONDS가 지났거나 그룹/상태가 바뀌었을 때만 상태 기록
+
+    Args:
+        state: 세션별로 유지되는 dict (마지막으로 쓴 경로/상태/시각 보관)
+        session_id: Streamlit 세션 ID (주어지면 세션이 끝났을 때 오프라인으로 기록하도록 등록)
+        create_group: 그룹이 없을 때 새로 만들어도 되는지 (write_presence 참고)
+
+    Returns:
+        실제로 기록했으면 True
+    """
+    now = time.time() if now is None else now
+    target = (group_path, members_key, user_id)
+    previous = state.get("target")
+    if (previous == target and state.get("status") == status
+            and now - state.get("written_at", 0) < PRESENCE_HEARTBEAT_SECONDS):
+        return False
+
+    if previous and previous != target and state.get("status") == "online":
+        # 다른 방으로 옮겼으면 이전 방에서는 오프라인으로 표시
+        try:
+            write_presence(db, *previous, "offline", now)
+        except Exception as e:
+            logger.warning(f"이전 접속 상태 정리 실패: {e}")
+
+    write_presence(db, group_path, members_key, user_id, status, now, create_group=create_group)
+    state.update(target=target, status=status, written_at=now)
+
+    if session_id is not None:
+        with _lock:
+            if status == "online":
+                _sessions[session_id] = target
+            else:
+                _sessions.pop(session_id, None)
+    return True
+
+
+def forget_sessions(group_path=None):
+    """
+    삭제된 그룹을 가리키는 세션 등록 지우기 (없으면 전체) - 끝난 세션을 정리할 때 다시 쓰지 않도록
+    """
+    with _lock:
+        for session_id in [session_id for session_id, target in _sessions.items()
+                           if group_path is None or target[0] == group_path]:
+            del _sessions[session_id]
+
+
+def sweep_ended_sessions(db, is_active, now=None):
+    """
+    런타임에서 사라진 세션의 사용자를 오프라인으로 기록 (PRESENCE_SWEEP_SECONDS마다 한 번만 확인)
+
+    Args:
+        is_active: Streamlit 세션 ID를 받아 아직 연결되어 있는지 돌려주는 함수
+
+    Returns:
+        오프라인으로 기록한 세션 수
+    """
+    global _last_sweep
+    now = time.time() if now is None else now
+    with _lock:
+        if now - _last_sweep < PRESENCE_SWEEP_SECONDS:
+            return 0
+        _last_sweep = now
+        ended = [(session_id, target) for session_id, target in _sessions.items() if not is_active(session_id)]
+        for session_id, _ in ended:
+            del _sessions[session_id]
+
+    for session_id, target in ended:
+        try:
+            write_presence(db, *target, "offline", now)
+        except Exception as e:
+            logger.warning(f"종료된 세션 상태 기록 실패: {e}")
+    if ended:
+        logger.info("종료된 세션 %d개를 오프라인으로 기록", len(ended))
+    return len(ended)
+
+
+def active_count(db, group_path, members_key, now=None):
+    """
+    그룹의 활성 인원 수 (저장된 값이 활동 기준 시간보다 오래됐으면 사용자 목록으로 계산)
+    """
+    now = time.time() if now is None else now
+    stored = cached_get(db, f"{group_path}/active_count")
+    if isinstance(stored, dict) and stored.get("computed_at", 0) > now - PRESENCE_ACTIVE_WINDOW:
+        return int(stored.get("count", 0))
+    return count_active(cached_get(db, f"{group_path}/{members_key}"), now)
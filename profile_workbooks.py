@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+엑셀 파일 일괄 분석 도구 - 폴더 안의 엑셀 파일을 여러 프로세스로 동시에 분석
+
+파일마다 openpyxl 읽기 전용 모드로 모든 행을 한 번 훑어 빈 셀/NaN 개수를 세고,
+앱과 같은 기준(column_profiler)으로 날짜 컬럼을 찾아 JSON/CSV 보고서를 남김
+
+사용 예:
+    python profile_workbooks.py 학교자료/ --output reports --workers 4
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from openpyxl import load_workbook
+
+# 날짜 컬럼 탐지에 사용할 표본 행 수 (파일 전체에서 고르게 뽑음)
+SAMPLE_ROWS = 200
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+def is_blank(value):
+    """빈 셀 (None 또는 공백 문자열)"""
+    return value is None or (isinstance(value, str) and value.strip() == '')
+
+
+def is_nan(value):
+    """NaN 값 (실수 NaN 또는 'nan' 문자열)"""
+    if isinstance(value, float):
+        return math.isnan(value)
+    return isinstance(value, str) and value.strip().lower() == 'nan'
+
+
+def header_names(header_row):
+    """헤더 행을 컬럼 이름 목록으로 (빈 헤더는 pandas처럼 'Unnamed: n')"""
+    return [str(value) if not is_blank(value) else f"Unnamed: {i}" for i, value in enumerate(header_row)]
+
+
+def profile_workbook(path, sample_rows=SAMPLE_ROWS):
+    """
+    엑셀 파일 하나 분석
+
+    Returns:
+        보고서 dict (파일, 시트, 행/열 수, 컬럼별 빈 셀/NaN 수, 날짜 컬럼 후보, 단계별 소요 시간)
+        rows와 컬럼별 빈 셀 수는 데이터가 있는 행만 세고, 데이터 사이의 완전히 빈 행은 empty_rows로 따로 셈
+    """
+    import pandas as pd
+    from column_profiler import profile_date_columns
+    from date_extraction import date_format_label, sniff_column_format
+
+    timings = {}
+    started = time.perf_counter()
+    report = {'file': path, 'sheet': None, 'rows': 0, 'empty_rows': 0, 'columns': [], 'date_columns': [], 'error': None}
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        sheet = workbook.active
+        report['sheet'] = sheet.title
+        timings['open'] = time.perf_counter() - started
+
+        # 모든 행을 한 번만 훑으면서 빈 셀/NaN을 세고 표본 행을 뽑음 (저수지 표본 추출)
+        scan_started = time.perf_counter()
+        rows = sheet.iter_rows(values_only=True)
+        header = header_names(next(rows, ()))
+        width = len(header)
+        blank_counts = [0] * width
+        nan_counts = [0] * width
+        rows_with_blank = 0
+        sample = []
+        rng = random.Random(0)
+        row_count = 0
+        empty_rows = 0
+        pending_empty_rows = 0
+        for row in rows:
+            if all(is_blank(value) for value in row):
+                # 완전히 빈 행은 빈 셀로 세지 않고 따로 셈 (뒤에 데이터가 더 있을 때만 - 끝부분의 빈 행은 제외)
+                pending_empty_rows += 1
+                continue
+            if pending_empty_rows:
+                empty_rows += pending_empty_rows
+                pending_empty_rows = 0
+            row_count += 1
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            has_blank = False
+            for col_no, value in enumerate(row):
+                if is_blank(value):
+                    blank_counts[col_no] += 1
+                    has_blank = True
+                elif is_nan(value):
+                    nan_counts[col_no] += 1
+            rows_with_blank += has_blank
+            if len(sample) < sample_rows:
+                sample.append(row)
+            else:
+                slot = rng.randrange(row_count)
+                if slot < sample_rows:
+                    sample[slot] = row
+        workbook.close()
+        timings['scan'] = time.perf_counter() - scan_started
+
+        report['rows'] = row_count
+        report['empty_rows'] = empty_rows
+        report['rows_with_blank'] = rows_with_blank
+        report['columns'] = [
+            {
+                'column': name,
+                'blank': blank_counts[i],
+                'nan': nan_counts[i],
+                'blank_ratio': round(blank_counts[i] / row_count, 4) if row_count else 0.0,
+            }
+            for i, name in enumerate(header)
+        ]
+
+        # 앱과 같은 기준으로 날짜 컬럼 후보 찾기
+        profile_started = time.perf_counter()
+        sample_df = pd.DataFrame(sample, columns=header)
+        for profile in profile_date_columns(sample_df):
+            column_format = sniff_column_format(sample_df[profile['column']])
+            report['date_columns'].append({
+                'column': profile['column'],
+                'score': profile['score'],
+                'reasons': profile['reasons'],
+                'example': profile['example'],
+                'format': column_format,
+                'format_label': date_format_label(column_format),
+            })
+        timings['profile'] = time.perf_counter() - profile_started
+    except Exception as e:
+        report['error'] = f"{type(e).__name__}: {e}"
+
+    timings['total'] = time.perf_counter() - started
+    report['timings'] = {step: round(seconds, 4) for step, seconds in timings.items()}
+    return report
+
+
+def report_name(path, root):
+    """
+    보고서 파일 이름 - 입력 폴더 기준 상대 경로에서 확장자를 빼고 폴더 구분자를 '__'로 바꿈
+    (다른 폴더의 같은 이름 파일이 서로 덮어쓰지 않도록)
+    """
+    relative = os.path.relpath(path, root) if root else os.path.basename(path)
+    return '__'.join(part for part in os.path.splitext(relative)[0].split(os.sep) if part not in ('', '.'))
+
+
+def assign_report_names(files):
+    """
+    (파일, 입력 폴더) 목록의 보고서 이름 정하기
+
+    Returns:
+        {파일: 보고서 이름}
+
+    Raises:
+        ValueError: 서로 다른 파일의 보고서 이름이 겹칠 때 (대소문자 구분 없이 비교)
+    """
+    names = {}
+    owners = {}
+    collisions = []
+    for path, root in files:
+        name = report_name(path, root)
+        owner = owners.setdefault(name.lower(), path)
+        if owner != path:
+            collisions.append(f"{owner} / {path} -> {name}")
+        names[path] = name
+    if collisions:
+        raise ValueError("보고서 이름이 겹치는 파일이 있습니다:\n  " + "\n  ".join(collisions))
+    return names
+
+
+def write_report(report, output_dir, formats, name):
+    """보고서를 파일별 JSON/CSV로 저장 (name: assign_report_names로 정한 보고서 이름)"""
+    if 'json' in formats:
+        with open(os.path.join(output_dir, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    if 'csv' in formats:
+        date_columns = {item['column']: item for item in report['date_columns']}
+        with open(os.path.join(output_dir, f"{name}.csv"), 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['file', 'sheet', 'rows', 'empty_rows', 'column', 'blank', 'nan', 'blank_ratio',
+                             'date_score', 'date_format', 'total_seconds', 'error'])
+            for column in report['columns'] or [{'column': '', 'blank': '', 'nan': '', 'blank_ratio': ''}]:
+                date_info = date_columns.get(column['column'], {})
+                writer.writerow([
+                    report['file'], report['sheet'], report['rows'], report['empty_rows'], column['column'],
+                    column['blank'], column['nan'], column['blank_ratio'],
+                    date_info.get('score', ''), date_info.get('format_label', ''),
+                    report['timings'].get('total', ''), report['error'] or ''
+                ])
+
+
+def find_workbooks(paths):
+    """
+    경로 목록(파일 또는 폴더)에서 엑셀 파일 찾기
+
+    Returns:
+        (파일 경로, 입력 폴더) 목록 (파일을 직접 지정했으면 입력 폴더는 None)
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.extend(
+                    (os.path.join(root, name), path) for name in sorted(names)
+                    if name.lower().endswith(EXCEL_EXTENSIONS) and not name.startswith('~$')
+                )
+        elif path.lower().endswith(EXCEL_EXTENSIONS):
+            found.append((path, None))
+    return list(dict.fromkeys(found))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="엑셀 파일 일괄 분석 (빈 셀/NaN, 날짜 컬럼 탐지)")
+    parser.add_argument('paths', nargs='*', default=['.'], help="분석할 파일 또는 폴더 (기본: 현재 폴더)")
+    parser.add_argument('--output', default='profile_reports', help="보고서 저장 폴더")
+    parser.add_argument('--format', choices=['json', 'csv', 'both'], default='both', help="보고서 형식")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="동시에 분석할 프로세스 수")
+    parser.add_argument('--sample-rows', type=int, default=SAMPLE_ROWS, help="날짜 컬럼 탐지용 표본 행 수")
+    args = parser.parse_args(argv)
+
+    files = find_workbooks(args.paths)
+    if not files:
+        print("분석할 엑셀 파일이 없습니다.")
+        return 1
+    try:
+        report_names = assign_report_names(files)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    files = list(report_names)
+    os.makedirs(args.output, exist_ok=True)
+    formats = ('json', 'csv') if args.format == 'both' else (args.format,)
+
+    print(f"{len(files)}개 파일 분석 시작 (프로세스 {args.workers}개)")
+    started = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(profile_workbook, path, args.sample_rows): path for path in files}
+        for done, future in enumerate(as_completed(futures), start=1):
+            report = future.result()
+            write_report(report, args.output, formats, report_names[futures[future]])
+            if report['error']:
+                failed += 1
+                print(f"[{done}/{len(files)}] ❌ {report['file']}: {report['error']}")
+            else:
+                date_columns = ', '.join(f"{item['column']}({item['score']})" for item in report['date_columns'][:3])
+                print(f"[{done}/{len(files)}] ✓ {report['file']}: {report['rows']}행, "
+                      f"날짜 컬럼 {date_columns or '없음'} ({report['timings']['total']:.2f}초)")
+
+    print(f"\n완료: {len(files) - failed}개 성공, {failed}개 실패, {time.perf_counter() - started:.2f}초 "
+          f"(보고서: {args.output})")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+진행률 표시 - 오래 걸리는 단계(날짜 추출, 파일 다운로드, 내보내기)의 진행 상황을
+일정 간격으로만 화면에 반영하고 처리 속도와 남은 시간을 함께 표시
+"""
+
+import time
+
+
+# 기본 갱신 조건: 0.2초마다 또는 진행률 1%p마다 (둘 중 먼저 도달하는 쪽)
+DEFAULT_MIN_INTERVAL = 0.2
+DEFAULT_MIN_STEP = 0.01
+
+
+def format_duration(seconds):
+    """
+    초 단위 시간을 '1분 5초' 형태 문자열로 변환
+    """
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}초"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}분 {seconds}초"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}시간 {minutes}분"
+
+
+class ThrottledProgress:
+    """
+    진행률 막대 갱신을 제한하는 진행률 표시기
+
+    update()는 자주 호출해도 되며, 마지막 갱신 이후 min_interval초가 지났거나
+    진행률이 min_step 이상 늘었을 때만 실제로 막대를 다시 그림 (브라우저로 보내는 갱신 수 제한)
+    """
+
+    def __init__(self, bar, total, label="처리 중", unit="행",
+                 min_interval=DEFAULT_MIN_INTERVAL, min_step=DEFAULT_MIN_STEP, clock=time.monotonic):
+        """
+        Args:
+            bar: progress(value, text=...) 메서드를 가진 진행률 막대 (예: st.progress(0))
+            total: 전체 처리 단위 수
+            label: 막대에 표시할 작업 이름
+            unit: 처리 단위 이름 (행, 개 등)
+            min_interval: 갱신 사이 최소 시간(초)
+            min_step: 갱신 사이 최소 진행률 증가량(0~1)
+            clock: 현재 시각(초)을 돌려주는 함수
+        """
+        self.bar = bar
+        self.total = max(int(total), 0)
+        self.label = label
+        self.unit = unit
+        self.min_interval = min_interval
+        self.min_step = min_step
+        self.clock = clock
+        self.done = 0
+        self.render_count = 0
+        self._started = clock()
+        self._last_render_time = None
+        self._last_render_ratio = 0.0
+
+    @property
+    def ratio(self):
+        if self.total == 0:
+            return 1.0
+        return min(self.done / self.total, 1.0)
+
+    def status_text(self):
+        """
+        '작업 이름: 120/500행 (60행/초, 남은 시간 약 7초)' 형태의 상태 문자열
+        """
+        text = f"{self.label}: {self.done:,}/{self.total:,}{self.unit}"
+        elapsed = self.clock() - self._started
+        if self.done > 0 and elapsed > 0:
+            rate = self.done / elapsed
+            text += f" ({rate:,.0f}{self.unit}/초"
+            if self.done < self.total:
+                text += f", 남은 시간 약 {format_duration((self.total - self.done) / rate)}"
+            text += ")"
+        return text
+
+    def update(self, done=None, advance=1):
+        """
+        진행 상황 갱신
+
+        Args:
+            done: 지금까지 처리한 단위 수 (주어지면 advance는 무시)
+            advance: done이 없을 때 더할 처리 단위 수
+        """
+        self.done = done if done is not None else self.done + advance
+        now = self.clock()
+        ratio = self.ratio
+        if (self._last_render_time is None
+                or ratio >= 1.0
+                or now - self._last_render_time >= self.min_interval
+                or ratio - self._last_render_ratio >= self.min_step):
+            self._render(now, ratio)
+
+    def finish(self):
+        """
+        전체 처리 완료로 표시 (마지막 상태가 반드시 화면에 반영되도록 강제 갱신)
+        """
+        self.done = self.total
+        self._render(self.clock(), 1.0)
+
+    def _render(self, now, ratio):
+        if ratio == self._last_render_ratio and self._last_render_time is not None and ratio >= 1.0:
+            return
+        self.bar.progress(ratio, text=self.status_text())
+        self.render_count += 1
+        self._last_render_time = now
+        self._last_render_ratio = ratio
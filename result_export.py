@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+결과 내보내기 - 결과 표를 xlsx(xlsxwriter constant_memory), CSV, Parquet 파일로 만들고
+같은 결과는 다시 만들지 않도록 결과 지문(fingerprint)별로 캐시
+"""
+
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 (Parquet 저장에 필요)
+    parquet_available = True
+except ImportError:
+    parquet_available = False
+
+# 형식별 (확장자, MIME 타입)
+EXPORT_FORMATS = {
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+# 프로세스 전체에서 보관할 내보내기 파일 수
+EXPORT_CACHE_SIZE = 16
+
+_export_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def available_export_formats():
+    """사용할 수 있는 내보내기 형식 목록 (Parquet은 pyarrow가 있을 때만)"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or parquet_available]
+
+
+def result_fingerprint(sheets):
+    """
+    결과 표들의 지문 (시트 이름, 컬럼, 값이 같으면 같은 값)
+
+    Args:
+        sheets: {시트 이름: 데이터프레임}
+    """
+    digest = hashlib.sha256()
+    for name, df in sheets.items():
+        digest.update(name.encode('utf-8'))
+        digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _cell_value(value):
+    """xlsxwriter에 쓸 셀 값 (결측값은 None)"""
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+
+def build_xlsx(sheets, progress=None):
+    """
+    시트별로 한 행씩 써서 xlsx 파일 만들기 (constant_memory: 행을 쓰는 즉시 임시 파일로 내보냄)
+
+    Args:
+        sheets: {시트 이름: 데이터프레임}
+        progress: update(advance=...)/finish()를 가진 진행률 표시기 (선택)
+    """
+    import xlsxwriter
+
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+        for row_no, row in enumerate(df.itertuples(index=False, name=None), start=1):
+            for col_no, value in enumerate(row):
+                value = _cell_value(value)
+                if value is None:
+                    continue
+                if isinstance(value, (date, datetime)):
+                    worksheet.write_datetime(row_no, col_no, value, date_format)
+                else:
+                    worksheet.write(row_no, col_no, value)
+            if progress is not None:
+                progress.update()
+    workbook.close()
+    if progress is not None:
+        progress.finish()
+    return output.getvalue()
+
+
+def _long_table(sheets):
+    """여러 시트를 '구분' 컬럼으로 구분한 하나의 표로 합침 (CSV/Parquet용)"""
+    frames = [df.assign(구분=name)[['구분'] + list(df.columns)] for name, df in sheets.items()]
+    table = pd.concat(frames, ignore_index=True)
+    if '날짜' in table:
+        table['날짜'] = pd.to_datetime(table['날짜'])
+    return table
+
+
+def build_export(sheets, fmt):
+    """지정한 형식의 파일 내용(bytes) 만들기"""
+    if fmt == 'xlsx':
+        return build_xlsx(sheets)
+    table = _long_table(sheets)
+    if fmt == 'csv':
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        return table.to_csv(index=False, date_format='%Y-%m-%d').encode('utf-8-sig')
+    if fmt == 'parquet':
+        output = io.BytesIO()
+        table.to_parquet(output, index=False)
+        return output.getvalue()
+    raise ValueError(f"지원하지 않는 내보내기 형식: {fmt}")
+
+
+def cached_export(fingerprint, sheets, fmt):
+    """
+    결과 지문과 형식별로 캐시된 파일 내용 (없으면 만들어서 캐시)
+    """
+    key = (fingerprint, fmt)
+    with _lock:
+        if key in _export_cache:
+            _export_cache.move_to_end(key)
+            return _export_cache[key]
+    data = build_export(sheets, fmt)
+    with _lock:
+        _export_cache[key] = data
+        while len(_export_cache) > EXPORT_CACHE_SIZE:
+            _export_cache.popitem(last=False)
+    return data
+
+
+def deferred_export(sheets, fmt):
+    """
+    다운로드 버튼에 넘길 함수 (버튼을 누를 때만 파일을 만들거나 캐시에서 가져옴)
+
+    Returns:
+        (인자 없는 함수, 확장자, MIME 타입)
+    """
+    fingerprint = result_fingerprint(sheets)
+    ext, mime = EXPORT_FORMATS[fmt]
+    return (lambda: cached_export(fingerprint, sheets, fmt)), ext, mime
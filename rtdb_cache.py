@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Realtime Database 읽기 캐시 - 같은 경로를 여러 번 읽어도 요청은 한 번만 보냄
+
+- 한 번의 실행(rerun) 안에서는 처음 읽은 값을 그대로 재사용 (begin_rerun()으로 초기화)
+- 실행 사이에는 프로세스 전체가 공유하는 짧은 TTL 캐시를 사용
+- 하위 경로는 캐시된 상위 경로의 값에서 꺼내 씀 (예: rooms/{학교}/{방}/state)
+- 이 모듈의 함수로 쓰면 쓴 경로와 그 상위/하위 경로의 캐시를 지움
+- TTL이 지난 항목은 읽고 쓸 때 지우고, 항목 수는 최대 개수로 제한 (오래 쓰지 않은 것부터 삭제)
+"""
+
+import os
+import copy
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger('전학공앱')
+
+# 실행 사이에 캐시된 값을 쓸 시간(초)
+RTDB_CACHE_TTL = float(os.environ.get('RTDB_CACHE_TTL', 5))
+# 실행 사이 캐시의 최대 항목 수
+RTDB_CACHE_MAX_ENTRIES = int(os.environ.get('RTDB_CACHE_MAX_ENTRIES', 256))
+
+_MISSING = object()
+
+# {(경로, shallow): (읽은 시각, 값)} - 최근에 쓴 항목이 뒤로 가도록 순서 유지
+_entries = OrderedDict()
+# 다른 스레드가 읽는 중인 경로 {(경로, shallow): Event}
+_inflight = {}
+# 무효화할 때마다 증가 (읽는 도중 같은 경로에 쓰기가 있었으면 읽은 값을 캐시하지 않음)
+_generation = 0
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def _normalize(path):
+    return '/'.join(part for part in str(path).split('/') if part)
+
+
+def _ancestors(path):
+    """자기 자신을 포함한 상위 경로 (가까운 것부터)"""
+    parts = path.split('/') if path else []
+    return ['/'.join(parts[:i]) for i in range(len(parts), -1, -1)]
+
+
+def _child_value(value, relative_parts):
+    """상위 경로의 값에서 하위 경로의 값 꺼내기 (없으면 None)"""
+    for part in relative_parts:
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
+
+
+def _shallow(value):
+    """shallow 조회 결과 형태 (하위 노드는 True)"""
+    if isinstance(value, dict):
+        return {key: True if isinstance(child, (dict, list)) else child for key, child in value.items()}
+    if isinstance(value, list):
+        return {str(i): True if isinstance(child, (dict, list)) else child
+                for i, child in enumerate(value) if child is not None}
+    return value
+
+
+def _lookup(store, path, shallow, now=None):
+    """
+    store에서 path의 값 찾기 (자기 자신 또는 캐시된 상위 경로에서 꺼냄)
+
+    now가 주어지면 TTL이 지난 항목은 지우고 쓰지 않음 (찾은 항목은 최근 사용으로 옮김)
+    """
+    parts = path.split('/') if path else []
+    for ancestor in _ancestors(path):
+        for ancestor_shallow in ((False, True) if ancestor == path and shallow else (False,)):
+            entry = store.get((ancestor, ancestor_shallow))
+            if entry is None:
+                continue
+            fetched_at, value = entry
+            if now is not None:
+                if now - fetched_at > RTDB_CACHE_TTL:
+                    del store[(ancestor, ancestor_shallow)]
+                    continue
+                store.move_to_end((ancestor, ancestor_shallow))
+            depth = len(ancestor.split('/')) if ancestor else 0
+            value = _child_value(value, parts[depth:])
+            return _shallow(value) if shallow and not ancestor_shallow else value
+    return _MISSING
+
+
+def _store(key, value, now):
+    """실행 사이 캐시에 넣기 (_lock 안에서 호출) - TTL이 지난 항목과 최대 개수를 넘는 항목 삭제"""
+    for old_key in [old_key for old_key, (fetched_at, _) in _entries.items()
+                    if now - fetched_at > RTDB_CACHE_TTL]:
+        del _entries[old_key]
+    _entries[key] = (now, value)
+    _entries.move_to_end(key)
+    while len(_entries) > RTDB_CACHE_MAX_ENTRIES:
+        _entries.popitem(last=False)
+
+
+def begin_rerun():
+    """새 실행 시작 - 이 스레드의 실행 단위 캐시 비우기 (스크립트 맨 앞에서 호출)"""
+    _local.memo = {}
+
+
+def _memo():
+    if not hasattr(_local, 'memo'):
+        _local.memo = {}
+    return _local.memo
+
+
+def cached_get(db, path, shallow=False):
+    """
+    캐시를 거쳐 경로의 값 읽기
+
+    Args:
+        db: firebase_admin.db 모듈 (reference()를 가진 객체)
+        path: 읽을 경로
+        shallow: True면 하위 노드의 키만 읽음
+
+    Returns:
+        값 (호출한 쪽에서 바꿔도 캐시에 영향 없도록 복사본)
+    """
+    path = _normalize(path)
+    key = (path, shallow)
+    memo = _memo()
+
+    value = _lookup(memo, path, shallow)
+    if value is not _MISSING:
+        return copy.deepcopy(value)
+
+    while True:
+        with _lock:
+            value = _lookup(_entries, path, shallow, now=time.monotonic())
+            if value is not _MISSING:
+                break
+            event = _inflight.get(key)
+            if event is None:
+                # 이 스레드가 읽어 옴
+                event = _inflight[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+            started_generation = _generation
+        if not owner:
+            # 같은 경로를 읽는 중인 다른 스레드의 결과를 기다림
+            event.wait()
+            continue
+        try:
+            logger.debug("RTDB 읽기: %s%s", path or '/', " (shallow)" if shallow else "")
+            ref = db.reference(path or '/')
+            value = ref.get(shallow=True) if shallow else ref.get()
+            with _lock:
+                if _generation == started_generation:
+                    _store(key, value, time.monotonic())
+        finally:
+            with _lock:
+                _inflight.pop(key, None)
+            event.set()
+        break
+
+    memo[key] = (None, value)
+    return copy.deepcopy(value)
+
+
+def invalidate(path):
+    """경로와 그 상위/하위 경로의 캐시 지우기 (이 스레드의 실행 단위 캐시 포함)"""
+    global _generation
+    path = _normalize(path)
+    ancestors = set(_ancestors(path))
+    prefix = f"{path}/" if path else ''
+
+    def stale(entry_path):
+        return entry_path in ancestors or entry_path.startswith(prefix)
+
+    with _lock:
+        _generation += 1
+        for key in [key for key in _entries if stale(key[0])]:
+            del _entries[key]
+    memo = _memo()
+    for key in [key for key in memo if stale(key[0])]:
+        del memo[key]
+
+
+def cached_set(db, path, value):
+    """경로에 값 쓰기 (캐시 무효화)"""
+    db.reference(path).set(value)
+    invalidate(path)
+
+
+def cached_update(db, path, values):
+    """경로 아래 여러 하위 경로를 한 번에 쓰기 (다중 경로 업데이트, 캐시 무효화)"""
+    db.reference(path or '/').update(values)
+    base = _normalize(path)
+    for child in values:
+        invalidate(f"{base}/{child}" if base else child)
+
+
+def cached_delete(db, path):
+    """경로 삭제 (캐시 무효화)"""
+    db.reference(path).delete()
+    invalidate(path)
+
+
+def cached_transaction(db, path, update_fn):
+    """경로의 현재 값을 받아 바꾼 값을 조건부로 쓰기 (트랜잭션, 캐시 무효화)"""
+    result = db.reference(path).transaction(update_fn)
+    invalidate(path)
+    return result
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+스프레드시트 읽기 - 설치된 가장 빠른 엔진(python-calamine)을 쓰고 없으면 openpyxl을 사용,
+앞부분 표본 행의 값과 헤더를 보고 필요한 컬럼(날짜 관련 + 신원 확인용)만 불러옴
+"""
+
+import os
+import hashlib
+import logging
+import importlib.util
+
+import pandas as pd
+
+from column_profiler import DATE_HEADER_KEYWORDS, PROFILE_SAMPLE_SIZE, profile_date_columns
+from date_extraction import PERIOD_COLUMN_KEYWORDS
+
+logger = logging.getLogger('전학공앱')
+
+# 엔진 강제 지정 ('calamine' 또는 'openpyxl', 없으면 자동 선택)
+SPREADSHEET_ENGINE = os.environ.get('SPREADSHEET_ENGINE', '')
+
+# 날짜 컬럼 외에 함께 읽을 신원/내용 확인용 컬럼 키워드
+IDENTITY_HEADER_KEYWORDS = ['성명', '이름', '신청자', '부서', '사유', '용무', '목적']
+
+# 읽는 방식(컬럼 선택, 변환)을 바꾸면 올림 - 읽은 파일 캐시에 남은 예전 결과를 쓰지 않도록
+READER_VERSION = 2
+
+_engine = None
+
+
+def excel_engine():
+    """
+    사용할 엑셀 엔진 ('calamine' 또는 'openpyxl')
+
+    calamine은 pandas 2.2 이상에서 python-calamine이 설치되어 있을 때만 사용
+    (openpyxl은 pandas가 읽기 전용 모드로 열기 때문에 셀 서식은 읽지 않음)
+    """
+    global _engine
+    if _engine is None:
+        if SPREADSHEET_ENGINE:
+            _engine = SPREADSHEET_ENGINE
+        else:
+            pandas_version = tuple(int(part) for part in pd.__version__.split('.')[:2])
+            has_calamine = importlib.util.find_spec('python_calamine') is not None
+            _engine = 'calamine' if has_calamine and pandas_version >= (2, 2) else 'openpyxl'
+        logger.info("스프레드시트 엔진: %s", _engine)
+    return _engine
+
+
+def _file_kind(source, filename=None):
+    """'excel', 'xls', 'csv' 또는 None (확장자 기준)"""
+    name = filename or getattr(source, 'name', None) or (source if isinstance(source, str) else '')
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext == '.xlsx':
+        return 'excel'
+    if ext == '.xls':
+        return 'xls'
+    if ext == '.csv':
+        return 'csv'
+    return None
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _read(source, kind, **kwargs):
+    _rewind(source)
+    if kind == 'csv':
+        return pd.read_csv(source, **kwargs)
+    engine = excel_engine()
+    if kind == 'xls' and engine != 'calamine':
+        # openpyxl은 .xls를 읽지 못하므로 pandas 기본 엔진 사용
+        engine = None
+    return pd.read_excel(source, engine=engine, **kwargs)
+
+
+def _matches(col, keywords):
+    col_lower = str(col).lower()
+    return any(keyword in col_lower for keyword in keywords)
+
+
+def is_date_header(col):
+    """날짜 관련 헤더인지"""
+    return _matches(col, PERIOD_COLUMN_KEYWORDS + DATE_HEADER_KEYWORDS)
+
+
+def keep_column(col):
+    """날짜 관련 또는 신원 확인용 헤더인지 (컬럼을 골라 읽을 때 사용)"""
+    return is_date_header(col) or _matches(col, IDENTITY_HEADER_KEYWORDS)
+
+
+def reader_signature(project=True):
+    """
+    읽은 결과에 영향을 주는 설정을 묶은 문자열 (읽기 방식 버전, 엔진, pandas 버전, 컬럼 선택 키워드)
+    """
+    if project:
+        keywords = PERIOD_COLUMN_KEYWORDS + DATE_HEADER_KEYWORDS + IDENTITY_HEADER_KEYWORDS
+        projection = hashlib.sha256('\n'.join(map(str, keywords)).encode('utf-8')).hexdigest()[:12]
+    else:
+        projection = 'all'
+    return f"v{READER_VERSION}/{excel_engine()}/pandas-{pd.__version__}/{projection}"
+
+
+def read_spreadsheet(source, filename=None, project=True):
+    """
+    엑셀/CSV 파일을 데이터프레임으로 읽기
+
+    Args:
+        source: 파일 경로 또는 파일 객체 (Streamlit UploadedFile 포함)
+        filename: 확장자 판단용 파일명 (source에서 알 수 없을 때)
+        project: True면 날짜 관련/신원 확인용 컬럼만 읽음 - 앞부분 PROFILE_SAMPLE_SIZE행을 먼저 읽어
+                 헤더 키워드가 없어도 값이 날짜인 컬럼(예: '신청일시')은 함께 읽고,
+                 날짜 컬럼을 하나도 찾지 못하면 전체 컬럼을 읽음
+
+    Returns:
+        데이터프레임 (지원하지 않는 형식이면 빈 데이터프레임)
+        df.attrs['source_columns']에 고르기 전 원본 파일의 전체 헤더 목록을 담음
+    """
+    kind = _file_kind(source, filename)
+    if kind is None:
+        return pd.DataFrame()
+
+    df = None
+    if project:
+        # 앞부분 표본만 모든 컬럼으로 읽어 값으로 날짜 컬럼을 찾음 (날짜 탐지와 같은 기준)
+        sample = _read(source, kind, nrows=PROFILE_SAMPLE_SIZE)
+        source_columns = list(sample.columns)
+        content_columns = {profile['column'] for profile in profile_date_columns(sample)
+                           if profile['content_ratio'] > 0}
+        positions = [i for i, col in enumerate(source_columns) if col in content_columns or keep_column(col)]
+        has_date_column = bool(content_columns) or any(is_date_header(col) for col in source_columns)
+        if has_date_column and len(positions) < len(source_columns):
+            df = _read(source, kind, usecols=positions)
+    else:
+        source_columns = None
+    if df is None:
+        df = _read(source, kind)
+    df.attrs['source_columns'] = [str(col) for col in (source_columns or df.columns)]
+    _rewind(source)
+    return df
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Storage 파일 일괄 삭제 - 삭제 요청을 배치 API로 묶고(배치당 최대 100개) 여러 배치를 동시에 보냄
+(클라이언트의 배치 상태는 스레드 간에 공유할 수 없으므로 스레드마다 클라이언트를 따로 만듦)
+
+버킷 전체 삭제는 목록을 페이지 단위로 받아 바로 삭제하고, 끝낸 페이지의 토큰을 체크포인트 파일에
+남겨 중단되면 그 다음 페이지부터 이어서 진행
+"""
+
+import os
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('전학공앱')
+
+# Storage 배치 요청 하나에 넣을 수 있는 최대 호출 수
+BATCH_SIZE = 100
+# 동시에 보낼 배치 수
+DELETE_WORKERS = 4
+# 버킷 전체 삭제 시 목록 한 페이지의 파일 수
+WIPE_PAGE_SIZE = 1000
+# 버킷 전체 삭제 체크포인트 파일
+WIPE_CHECKPOINT_PATH = os.environ.get('WIPE_CHECKPOINT_PATH', os.path.join('cache', 'wipe_checkpoint.json'))
+
+
+def chunked(items, size):
+    """목록을 size개씩 나눔"""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _is_not_found(error):
+    return getattr(error, 'code', None) == 404
+
+
+def _is_precondition_failed(error):
+    return getattr(error, 'code', None) == 412
+
+
+def _delete(bucket, name, generation=None):
+    """파일 삭제 (generation이 주어지면 그 generation일 때만)"""
+    if generation is None:
+        bucket.blob(name).delete()
+    else:
+        bucket.blob(name).delete(if_generation_match=generation)
+
+
+def delete_blob_batch(client, bucket_name, names, generations=None):
+    """
+    한 번의 배치 요청으로 삭제
+
+    배치 중 하나라도 실패하면 예외가 나므로, 그때는 하나씩 다시 삭제해 실패한 파일만 골라냄
+    (배치에서 이미 지워진 파일은 404가 나므로 삭제된 것으로 셈)
+
+    generations에 있는 파일은 그 generation일 때만 삭제 (그 사이 다시 올린 파일은 412로 남겨 두고
+    삭제한 수에도 실패한 수에도 넣지 않음)
+
+    Returns:
+        (삭제한 파일 수, 삭제하지 못한 파일 이름 목록)
+    """
+    bucket = client.bucket(bucket_name)
+    generations = generations or {}
+    try:
+        with client.batch():
+            for name in names:
+                _delete(bucket, name, generations.get(name))
+        return len(names), []
+    except Exception as e:
+        logger.warning(f"배치 삭제 일부 실패, 하나씩 다시 시도: {e}")
+
+    deleted = 0
+    failed = []
+    for name in names:
+        try:
+            _delete(bucket, name, generations.get(name))
+            deleted += 1
+        except Exception as e:
+            if _is_not_found(e):
+                deleted += 1
+            elif _is_precondition_failed(e):
+                logger.info(f"다시 올린 파일이라 삭제하지 않음: {name}")
+            else:
+                logger.warning(f"Blob 삭제 실패: {name} - {e}")
+                failed.append(name)
+    return deleted, failed
+
+
+def _batch_runner(client_factory, bucket_name, generations=None):
+    """스레드마다 클라이언트를 하나씩 만들어 배치를 삭제하는 함수"""
+    local = threading.local()
+
+    def run(batch):
+        if not hasattr(local, 'client'):
+            local.client = client_factory()
+        try:
+            return delete_blob_batch(local.client, bucket_name, batch, generations)
+        except Exception as e:
+            logger.error(f"배치 삭제 실패: {e}")
+            return 0, list(batch)
+
+    return run
+
+
+def delete_blobs(names, client_factory, bucket_name, max_workers=DELETE_WORKERS, batch_size=BATCH_SIZE,
+                 generations=None):
+    """
+    여러 Storage 파일을 배치로 묶어 동시에 삭제
+
+    Args:
+        names: 삭제할 Storage 경로 목록
+        client_factory: Storage 클라이언트를 새로 만드는 함수 (스레드마다 한 번 호출)
+        bucket_name: 버킷 이름
+        max_workers: 동시에 보낼 배치 수
+        batch_size: 배치 하나에 넣을 삭제 요청 수
+        generations: {Storage 경로: generation} - 있는 파일은 그 generation일 때만 삭제
+
+    Returns:
+        (삭제한 파일 수, 삭제하지 못한 파일 이름 목록)
+    """
+    batches = chunked(dict.fromkeys(names), batch_size)
+    if not batches:
+        return 0, []
+
+    run = _batch_runner(client_factory, bucket_name, generations)
+    deleted = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+        for batch_deleted, batch_failed in executor.map(run, batches):
+            deleted += batch_deleted
+            failed.extend(batch_failed)
+    return deleted, failed
+
+
+def load_wipe_checkpoint(bucket_name, path=None):
+    """
+    중단된 버킷 전체 삭제의 체크포인트 (없거나 다른 버킷의 것이면 None)
+
+    Returns:
+        {'bucket', 'page_token', 'deleted', 'failed'} dict
+    """
+    path = path or WIPE_CHECKPOINT_PATH
+    try:
+        with open(path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return checkpoint if checkpoint.get('bucket') == bucket_name else None
+
+
+def _save_wipe_checkpoint(checkpoint, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path)
+
+
+def wipe_bucket(bucket, client_factory, progress=None, checkpoint_path=None,
+                page_size=WIPE_PAGE_SIZE, max_workers=DELETE_WORKERS, batch_size=BATCH_SIZE):
+    """
+    버킷의 모든 파일 삭제 (목록 전체를 메모리에 올리지 않고 페이지 단위로 처리)
+
+    페이지를 받으면 바로 배치 삭제를 작업 스레드에 넘기고, 그동안 다음 페이지를 받음
+    (동시에 처리 중인 페이지는 최대 2개). 한 페이지의 삭제가 끝날 때마다 다음 페이지 토큰을
+    체크포인트에 저장하므로 중단된 뒤 다시 실행하면 그 페이지부터 이어서 목록을 받음
+
+    Args:
+        bucket: Storage 버킷
+        client_factory: Storage 클라이언트를 새로 만드는 함수 (스레드마다 한 번 호출)
+        progress: 페이지가 끝날 때마다 (삭제한 수, 실패한 수)로 호출할 함수 (메인 스레드)
+        checkpoint_path: 체크포인트 파일 경로 (기본: WIPE_CHECKPOINT_PATH)
+
+    Returns:
+        (삭제한 파일 수, 실패한 파일 수) - 이어서 진행한 경우 이전 실행의 수 포함
+    """
+    checkpoint_path = checkpoint_path or WIPE_CHECKPOINT_PATH
+    checkpoint = load_wipe_checkpoint(bucket.name, checkpoint_path) or {
+        'bucket': bucket.name, 'page_token': None, 'deleted': 0, 'failed': 0
+    }
+    if checkpoint['page_token']:
+        logger.info("중단된 버킷 삭제를 이어서 진행 (이전 삭제 %d개)", checkpoint['deleted'])
+
+    run = _batch_runner(client_factory, bucket.name)
+
+    def finish_page(futures, next_token):
+        for future in futures:
+            batch_deleted, batch_failed = future.result()
+            checkpoint['deleted'] += batch_deleted
+            checkpoint['failed'] += len(batch_failed)
+        checkpoint['page_token'] = next_token
+        _save_wipe_checkpoint(checkpoint, checkpoint_path)
+        if progress is not None:
+            progress(checkpoint['deleted'], checkpoint['failed'])
+
+    blobs = bucket.list_blobs(page_token=checkpoint['page_token'], page_size=page_size,
+                              fields="items(name),nextPageToken")
+    pending = None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for page in blobs.pages:
+                names = [blob.name for blob in page]
+                futures = [executor.submit(run, batch) for batch in chunked(names, batch_size)]
+                if pending is not None:
+                    finish_page(*pending)
+                pending = (futures, blobs.next_page_token)
+        finally:
+            # 목록 조회가 중단되어도 이미 넘긴 페이지의 삭제는 끝내고 체크포인트에 반영
+            if pending is not None:
+                finish_page(*pending)
+
+    try:
+        os.remove(checkpoint_path)
+    except FileNotFoundError:
+        pass
+    return checkpoint['deleted'], checkpoint['failed']
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+시간대 일정 색인 - 업무 기간을 분 단위 시각 구간으로 정렬해 두고
+특정 시간대(예: 전학공 모임 15:00~17:00)에 겹치는 일정이 있는지 한 번에 조회
+"""
+
+import numpy as np
+import pandas as pd
+
+# 'YYYY.MM.DD HH:MM ~ YYYY.MM.DD HH:MM' 형식의 시작/종료 시각
+PERIOD_TIME_PATTERN = (
+    r'^\S+\s+(?P<start_hour>[0-9]{1,2}):(?P<start_minute>[0-9]{2})(?::[0-9]{2})?\s*~\s*'
+    r'\S+\s+(?P<end_hour>[0-9]{1,2}):(?P<end_minute>[0-9]{2})'
+)
+
+# 기본 조회 시간대와 시간 단위
+DEFAULT_WINDOW = ('15:00', '17:00')
+DEFAULT_SLOT_MINUTES = 60
+
+_NAT_MINUTE = np.datetime64('NaT', 'm')
+
+
+def _minutes(hours, minutes):
+    return (pd.to_numeric(hours) * 60 + pd.to_numeric(minutes)).to_numpy(dtype='int64')
+
+
+def interval_timestamps(raw_values, start_days, end_days=None):
+    """
+    업무 기간의 시작/종료 시각 계산
+
+    시각이 있는 기간 값('2025.12.05 08:30 ~ 2025.12.05 09:30')은 그 시각을 쓰고,
+    시각이 없는 값은 시작일 0시부터 종료일(없으면 시작일) 다음 날 0시까지 하루 전체로 봄
+
+    Args:
+        raw_values: 원본 값 (추출에 사용된 컬럼의 값)
+        start_days: 추출된 시작 날짜 (datetime64[D])
+        end_days: 추출된 종료 날짜 (datetime64[D], NaT면 시작일)
+
+    Returns:
+        (시작 시각, 종료 시각) datetime64[m] 배열 - 종료 시각은 포함하지 않음
+    """
+    start_days = np.asarray(start_days, dtype='datetime64[D]')
+    end_days = start_days if end_days is None else np.asarray(end_days, dtype='datetime64[D]')
+    end_days = np.where(np.isnat(end_days), start_days, end_days)
+
+    starts = start_days.astype('datetime64[m]')
+    ends = (end_days + 1).astype('datetime64[m]')
+
+    raw_values = pd.Series(raw_values, dtype=object).reset_index(drop=True)
+    is_str = (raw_values.map(type) == str).to_numpy()
+    if is_str.any():
+        times = raw_values[is_str].astype(str).str.extract(PERIOD_TIME_PATTERN)
+        timed = times['start_hour'].notna().to_numpy()
+        idx = np.flatnonzero(is_str)[timed]
+        times = times[timed]
+        start_minutes = _minutes(times['start_hour'], times['start_minute'])
+        end_minutes = _minutes(times['end_hour'], times['end_minute'])
+        starts[idx] = start_days[idx].astype('datetime64[m]') + start_minutes.astype('timedelta64[m]')
+        ends[idx] = end_days[idx].astype('datetime64[m]') + end_minutes.astype('timedelta64[m]')
+
+    # 날짜를 알 수 없거나 종료가 시작보다 이르면 제외
+    invalid = np.isnat(starts) | (ends <= starts)
+    starts[invalid] = _NAT_MINUTE
+    ends[invalid] = _NAT_MINUTE
+    return starts, ends
+
+
+class TimeIntervalIndex:
+    """
+    시각 구간 색인 (시작 시각 순 정렬 + 종료 시각 정렬)
+
+    조회 구간 [a, b)와 겹치는 일정 수 = (시작 < b인 일정 수) - (종료 <= a인 일정 수)
+    두 값 모두 이진 탐색으로 구하므로 일정이 수만 개여도 조회는 슬롯 수에만 비례
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype='datetime64[m]')
+        ends = np.asarray(ends, dtype='datetime64[m]')
+        valid = ~(np.isnat(starts) | np.isnat(ends))
+        self.starts = np.sort(starts[valid])
+        self.ends = np.sort(ends[valid])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlap_counts(self, slot_starts, slot_ends):
+        """각 조회 구간 [slot_start, slot_end)와 겹치는 일정 수"""
+        started = np.searchsorted(self.starts, slot_ends, side='left')
+        finished = np.searchsorted(self.ends, slot_starts, side='right')
+        return started - finished
+
+
+def day_slots(days, window=DEFAULT_WINDOW, slot_minutes=DEFAULT_SLOT_MINUTES):
+    """
+    날짜마다 시간대를 일정 길이의 슬롯으로 나눔
+
+    Args:
+        days: datetime64[D] 날짜 배열
+        window: ('HH:MM', 'HH:MM') 조회 시간대
+        slot_minutes: 슬롯 길이(분)
+
+    Returns:
+        (슬롯 시작, 슬롯 종료) datetime64[m] 배열 (날짜순, 같은 날은 시각순)
+    """
+    window_start, window_end = (int(h) * 60 + int(m) for h, m in (t.split(':') for t in window))
+    offsets = np.arange(window_start, window_end - slot_minutes + 1, slot_minutes)
+    slot_starts = (np.asarray(days, dtype='datetime64[D]').astype('datetime64[m]')[:, None]
+                   + offsets.astype('timedelta64[m]')[None, :]).ravel()
+    return slot_starts, slot_starts + np.timedelta64(slot_minutes, 'm')
+
+
+def slot_table(index, days, window=DEFAULT_WINDOW, slot_minutes=DEFAULT_SLOT_MINUTES):
+    """
+    날짜별 시간 슬롯과 겹치는 일정 수 데이터프레임
+
+    Returns:
+        '날짜', '시작', '종료', '겹치는_일정' 컬럼 데이터프레임
+    """
+    slot_starts, slot_ends = day_slots(days, window, slot_minutes)
+    return pd.DataFrame({
+        '날짜': slot_starts.astype('datetime64[D]').astype('datetime64[ns]'),
+        '시작': pd.to_datetime(slot_starts).strftime('%H:%M'),
+        '종료': pd.to_datetime(slot_ends).strftime('%H:%M'),
+        '겹치는_일정': index.overlap_counts(slot_starts, slot_ends),
+    })